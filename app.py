@@ -16,6 +16,7 @@ from flask_wtf.csrf import CSRFError
 from itsdangerous import URLSafeTimedSerializer
 from werkzeug.exceptions import HTTPException
 
+from data_source.db_connection import init_db_connection
 from data_source.user_queries import get_user_by_id, get_user_session_token
 from domain.entity.user import User
 from presentation.controller.admin_controller import admin_bp
@@ -109,6 +110,9 @@ def create_app():
 
     Session(app)
 
+    # One pooled DB connection per request, committed at teardown
+    init_db_connection(app)
+
     login_manager = LoginManager()
     login_manager.login_view = "login.login"
     login_manager.init_app(app)
@@ -1,3 +1,4 @@
+from data_source.content_version_queries import bump_content_version
 from data_source.db_connection import get_connection
 
 
@@ -6,6 +7,7 @@ def delete_sports_activity(activity_id: int):
     cursor = connection.cursor()
     cursor.execute("DELETE FROM sports_activity WHERE id = %s", (activity_id,))
     connection.commit()
+    bump_content_version("bulletin")
     success = cursor.rowcount > 0
     cursor.close()
     connection.close()
@@ -15,7 +17,7 @@ def delete_sports_activity(activity_id: int):
 def get_social_post_by_id(post_id: int):
     connection = get_connection()
     cursor = connection.cursor()
-    cursor.execute("SELECT * FROM feed WHERE id = %s", (post_id,))
+    cursor.execute("SELECT id, image_path FROM feed WHERE id = %s", (post_id,))
     post = cursor.fetchone()
     cursor.close()
     connection.close()
@@ -27,6 +29,7 @@ def delete_social_post(post_id: int):
     cursor = connection.cursor()
     cursor.execute("DELETE FROM feed WHERE id = %s", (post_id,))
     connection.commit()
+    bump_content_version("feed")
     success = cursor.rowcount > 0
     cursor.close()
     connection.close()
@@ -1,7 +1,14 @@
 from flask_login import current_user
 
+from data_source.content_version_queries import bump_content_version
 from data_source.db_connection import get_connection
 
+# Columns the bulletin listings turn into SportsActivity entities
+BULLETIN_COLUMNS = """
+    id, user_id, activity_name, activity_type, skills_req, date, location, max_pax,
+    participant_count
+"""
+
 
 def get_host_id(activity_id: int):
     connection = get_connection()
@@ -13,22 +20,117 @@ def get_host_id(activity_id: int):
     return result
 
 
-def get_all_bulletin():
+def get_all_bulletin(after=None, limit=None):
+    """Upcoming activities with free spots, soonest first.
+
+    Args:
+        after (tuple): (date, id) of the last activity on the previous page;
+            only activities after it are returned
+        limit (int): Maximum number of rows, or None for all of them
+
+    Returns:
+        list: Rows with BULLETIN_COLUMNS, ordered by date then id
+    """
+    connection = get_connection()
+    cursor = connection.cursor(dictionary=True)
+    # (date, id) is a range scan on idx_sports_activity_date, whose entries
+    # end with the primary key; full activities are left out
+    query = f"""
+        SELECT {BULLETIN_COLUMNS} FROM sports_activity
+        WHERE date >= CURDATE() AND participant_count < max_pax
+    """
+    params = []
+    if after is not None:
+        query += " AND (date > %s OR (date = %s AND id > %s))"
+        params += [after[0], after[0], after[1]]
+    query += " ORDER BY date, id"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    cursor.execute(query, tuple(params))
+    bulletin_data = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    return bulletin_data
+
+
+# Words the full-text index never matches: shorter than MySQL's default
+# innodb_ft_min_token_size, or on InnoDB's default stopword list
+FULLTEXT_MIN_TOKEN_SIZE = 3
+FULLTEXT_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or "
+    "that the this to was what when where who will with und www".split()
+)
+
+
+def search_activities(terms, limit):
+    """Upcoming activities with free spots matching any of the search terms.
+
+    Terms are matched as word prefixes against the ft_sports_activity_search
+    full-text index on activity_name, skills_req and location. Terms the
+    index cannot match (too short, or stopwords) are left out; if that
+    leaves none, the columns are searched with LIKE instead.
+
+    Args:
+        terms (list): Words to search for, without full-text operators
+        limit (int): Maximum number of rows
+
+    Returns:
+        list: Rows with BULLETIN_COLUMNS, most relevant first, then by date
+    """
+    indexed_terms = [
+        term
+        for term in terms
+        if len(term) >= FULLTEXT_MIN_TOKEN_SIZE
+        and term.lower() not in FULLTEXT_STOPWORDS
+    ]
+    if not indexed_terms:
+        return search_activities_by_substring(terms, limit)
     connection = get_connection()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM sports_activity WHERE date >= CURDATE()")
+    against = " ".join(f"{term}*" for term in indexed_terms)
+    cursor.execute(
+        f"""
+        SELECT {BULLETIN_COLUMNS},
+            MATCH(activity_name, skills_req, location) AGAINST (%s IN BOOLEAN MODE)
+                AS relevance
+        FROM sports_activity
+        WHERE MATCH(activity_name, skills_req, location) AGAINST (%s IN BOOLEAN MODE)
+          AND date >= CURDATE() AND participant_count < max_pax
+        ORDER BY relevance DESC, date, id
+        LIMIT %s
+        """,
+        (against, against, limit),
+    )
     bulletin_data = cursor.fetchall()
     cursor.close()
     connection.close()
     return bulletin_data
 
 
-def get_bulletin_via_name(activity_name: str):
+def search_activities_by_substring(terms, limit):
+    """Upcoming activities with free spots containing any of the terms.
+
+    Unindexed scan for short queries the full-text index cannot answer.
+
+    Returns:
+        list: Rows with BULLETIN_COLUMNS, soonest first
+    """
     connection = get_connection()
     cursor = connection.cursor(dictionary=True)
+    matches = " OR ".join(
+        ["activity_name LIKE %s OR skills_req LIKE %s OR location LIKE %s"] * len(terms)
+    )
+    params = [f"%{term}%" for term in terms for _ in range(3)]
     cursor.execute(
-        "SELECT * FROM sports_activity WHERE activity_name LIKE %s AND date >= CURDATE()",
-        (f"%{activity_name}%",),
+        f"""
+        SELECT {BULLETIN_COLUMNS} FROM sports_activity
+        WHERE ({matches})
+          AND date >= CURDATE() AND participant_count < max_pax
+        ORDER BY date, id
+        LIMIT %s
+        """,
+        (*params, limit),
     )
     bulletin_data = cursor.fetchall()
     cursor.close()
@@ -40,7 +142,7 @@ def get_sports_activity_by_id(activity_id: int):
     connection = get_connection()
     cursor = connection.cursor(dictionary=True)
     cursor.execute(
-        "SELECT * FROM sports_activity WHERE id = %s AND date >= CURDATE()",
+        f"SELECT {BULLETIN_COLUMNS} FROM sports_activity WHERE id = %s AND date >= CURDATE()",
         (activity_id,),
     )
     activity_data = cursor.fetchone()
@@ -49,17 +151,86 @@ def get_sports_activity_by_id(activity_id: int):
     return activity_data
 
 
-def update_sports_activity(activity_id: int, user_id_list_join: str) -> bool:
+# Outcomes of join_activity()
+JOINED = "joined"
+ALREADY_JOINED = "already_joined"
+ACTIVITY_FULL = "activity_full"
+
+
+def join_activity(activity_id: int, user_id: int):
+    """Add user_id to the activity if it has a free spot.
+
+    Returns JOINED, ALREADY_JOINED or ACTIVITY_FULL, or None if there is no
+    such upcoming activity. The spot is taken by a conditional update of
+    participant_count, which locks the activity row until the caller's
+    transaction ends, so concurrent joins are checked one after another
+    and cannot take more than max_pax spots between them.
+    """
+    connection = get_connection()
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(
+        """
+        UPDATE sports_activity SET participant_count = participant_count + 1
+        WHERE id = %s AND date >= CURDATE() AND participant_count < max_pax
+          AND NOT EXISTS (
+              SELECT 1 FROM activity_participant WHERE activity_id = %s AND user_id = %s
+          )
+        """,
+        (activity_id, activity_id, user_id),
+    )
+    if cursor.rowcount > 0:
+        cursor.execute(
+            "INSERT INTO activity_participant (activity_id, user_id) VALUES (%s, %s)",
+            (activity_id, user_id),
+        )
+        connection.commit()
+        bump_content_version("bulletin")
+        outcome = JOINED
+    else:
+        # The update locked the row if it exists; find out why it matched nothing
+        cursor.execute(
+            """
+            SELECT EXISTS(
+                SELECT 1 FROM activity_participant WHERE activity_id = %s AND user_id = %s
+            ) AS joined
+            FROM sports_activity WHERE id = %s AND date >= CURDATE()
+            """,
+            (activity_id, user_id, activity_id),
+        )
+        activity = cursor.fetchone()
+        if not activity:
+            outcome = None
+        elif activity["joined"]:
+            outcome = ALREADY_JOINED
+        else:
+            outcome = ACTIVITY_FULL
+    cursor.close()
+    connection.close()
+    return outcome
+
+
+def remove_participant(activity_id: int, user_id: int) -> bool:
     connection = get_connection()
     cursor = connection.cursor()
-    query = """
-        UPDATE sports_activity
-        SET user_id_list_join = %s
-        WHERE id = %s
-    """
-    cursor.execute(query, (user_id_list_join, activity_id))
-    connection.commit()
-    success = cursor.rowcount > 0  # True if at least one row was updated
+    # Lock the activity row first, as join_activity() does, and only free
+    # the spot if the user had joined
+    cursor.execute(
+        """
+        UPDATE sports_activity SET participant_count = participant_count - 1
+        WHERE id = %s AND participant_count > 0 AND EXISTS (
+            SELECT 1 FROM activity_participant WHERE activity_id = %s AND user_id = %s
+        )
+        """,
+        (activity_id, activity_id, user_id),
+    )
+    success = cursor.rowcount > 0  # False if the user had not joined
+    if success:
+        cursor.execute(
+            "DELETE FROM activity_participant WHERE activity_id = %s AND user_id = %s",
+            (activity_id, user_id),
+        )
+        connection.commit()
+        bump_content_version("bulletin")
     cursor.close()
     connection.close()
     return success
@@ -89,6 +260,7 @@ def insert_new_activity(activity_data):
     )
 
     connection.commit()
+    bump_content_version("bulletin")
     cursor.close()
     connection.close()
     return True
@@ -99,7 +271,12 @@ def get_bulletin_by_types(activity_types):
     cursor = connection.cursor(dictionary=True)
 
     format_strings = ",".join(["%s"] * len(activity_types))
-    query = f"SELECT * FROM sports_activity WHERE activity_type IN ({format_strings}) AND date >= CURDATE()"
+    query = f"""
+        SELECT {BULLETIN_COLUMNS} FROM sports_activity
+        WHERE activity_type IN ({format_strings})
+          AND date >= CURDATE() AND participant_count < max_pax
+        ORDER BY date, id
+    """
 
     cursor.execute(query, tuple(activity_types))
     data = cursor.fetchall()
@@ -117,13 +294,12 @@ def update_sports_activity_details(
     date,
     location,
     max_pax,
-    user_id_list_join,
 ):
     connection = get_connection()
     cursor = connection.cursor()
     query = """
         UPDATE sports_activity
-        SET activity_name=%s, activity_type=%s, skills_req=%s, date=%s, location=%s, max_pax=%s, user_id_list_join=%s
+        SET activity_name=%s, activity_type=%s, skills_req=%s, date=%s, location=%s, max_pax=%s
         WHERE id=%s
     """
     cursor.execute(
@@ -135,11 +311,11 @@ def update_sports_activity_details(
             date,
             location,
             max_pax,
-            user_id_list_join,
             activity_id,
         ),
     )
     connection.commit()
+    bump_content_version("bulletin")
     cursor.close()
     connection.close()
     return True
@@ -149,10 +325,7 @@ def get_joined_user_names_by_activity_id(activity_id: int):
     connection = get_connection()
     cursor = connection.cursor(dictionary=True)
     # Check if current user is the host
-    cursor.execute(
-        "SELECT user_id, user_id_list_join FROM sports_activity WHERE id = %s",
-        (activity_id,),
-    )
+    cursor.execute("SELECT user_id FROM sports_activity WHERE id = %s", (activity_id,))
     result = cursor.fetchone()
     if not result:
         cursor.close()
@@ -163,22 +336,17 @@ def get_joined_user_names_by_activity_id(activity_id: int):
         cursor.close()
         connection.close()
         return []
-    # Get the user_id_list_join for the activity
-    if not result.get("user_id_list_join"):
-        cursor.close()
-        connection.close()
-        return []
-    user_id_list = [
-        uid.strip() for uid in result["user_id_list_join"].split(",") if uid.strip()
-    ]
-    if not user_id_list:
-        cursor.close()
-        connection.close()
-        return []
-    # Fetch only user names for these IDs
-    format_strings = ",".join(["%s"] * len(user_id_list))
-    query = f"SELECT name FROM user WHERE id IN ({format_strings})"
-    cursor.execute(query, tuple(user_id_list))
+    # Fetch only user names of the participants, in the order they joined
+    cursor.execute(
+        """
+        SELECT u.name
+        FROM activity_participant ap
+        JOIN user u ON u.id = ap.user_id
+        WHERE ap.activity_id = %s
+        ORDER BY ap.joined_at, ap.user_id
+        """,
+        (activity_id,),
+    )
     users = cursor.fetchall()
     cursor.close()
     connection.close()
@@ -194,6 +362,7 @@ def get_hosted_activities(user_id):
         SELECT sa.id, sa.activity_name, sa.activity_type, sa.skills_req, sa.date, sa.location, sa.max_pax
         FROM sports_activity sa
         WHERE sa.user_id = %s AND sa.date >= CURDATE()
+        ORDER BY sa.date, sa.id
         """,
         (user_id,),
     )
@@ -209,8 +378,10 @@ def get_joined_activities(user_id):
     cursor.execute(
         """
         SELECT sa.id, sa.activity_name, sa.activity_type, sa.skills_req, sa.date, sa.location, sa.max_pax
-        FROM sports_activity sa
-        WHERE sa.user_id != %s AND sa.date >= CURDATE() AND FIND_IN_SET(%s, sa.user_id_list_join)
+        FROM activity_participant ap
+        JOIN sports_activity sa ON sa.id = ap.activity_id
+        WHERE ap.user_id = %s AND sa.user_id != %s AND sa.date >= CURDATE()
+        ORDER BY sa.date, sa.id
         """,
         (user_id, user_id),
     )
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _shared_store(name, ttl):
+    """cachelib store shared by every worker, or None when CACHE_DIR is unset.
+
+    Gunicorn workers are separate processes, so an in-process dict is only
+    invalidated in the worker that handled the write. Pointing CACHE_DIR at
+    a directory all workers can see makes them share entries instead.
+    """
+    cache_dir = os.getenv("CACHE_DIR")
+    if not cache_dir:
+        return None
+    from cachelib import FileSystemCache
+
+    return FileSystemCache(os.path.join(cache_dir, name), default_timeout=ttl)
+
+
+class TTLCache:
+    """Thread-safe cache whose entries expire after ``ttl`` seconds.
+
+    Args:
+        name (str): Label used in stats and for the shared store directory.
+        ttl (float): Seconds an entry stays valid.
+        max_entries (int): Evict the least recently used entry beyond this
+            many (None = unbounded).
+        shared: Optional cachelib-style store (get/set/delete/clear). When
+            given, entries are kept there instead of in this process.
+    """
+
+    def __init__(self, name, ttl, max_entries=None, shared=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._shared = shared
+        self._lock = threading.Lock()
+        # key -> (expires_at, value), least recently used first
+        self._entries = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def get(self, key, default=None):
+        if self._shared is not None:
+            value = self._shared.get(key)
+            with self._lock:
+                self._stats["hits" if value is not None else "misses"] += 1
+            return default if value is None else value
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def peek(self, key, default=None):
+        """Like get(), but without counting a hit or miss or touching LRU order."""
+        if self._shared is not None:
+            value = self._shared.get(key)
+            return default if value is None else value
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return default
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._stats["sets"] += 1
+        if self._shared is not None:
+            self._shared.set(key, value, timeout=self.ttl)
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, key, load):
+        """Return the cached value for key, calling load() on a miss.
+
+        Falsy results (e.g. an empty list after a DB error) are returned but
+        not cached, so the next call tries again.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = load()
+        if value:
+            self.set(key, value)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._stats["invalidations"] += 1
+            self._entries.pop(key, None)
+        if self._shared is not None:
+            self._shared.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._stats["invalidations"] += 1
+            self._entries.clear()
+        if self._shared is not None:
+            self._shared.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update(
+                {
+                    "ttl": self.ttl,
+                    "max_entries": self.max_entries,
+                    "size": len(self._entries),
+                    "shared": self._shared is not None,
+                    "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+                }
+            )
+        return stats
+
+
+def get_cache(name, ttl, max_entries=None):
+    """Return the process-wide cache called name, creating it on first use."""
+    with _registry_lock:
+        cache = _registry.get(name)
+        if cache is None:
+            cache = _registry[name] = TTLCache(
+                name, ttl, max_entries=max_entries, shared=_shared_store(name, ttl)
+            )
+    return cache
+
+
+def get_cache_stats():
+    """Hit/miss counters of every cache in this process, keyed by name."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
@@ -0,0 +1,258 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class PooledConnection:
+    """Proxy around a raw mysql.connector connection owned by a pool.
+
+    Query modules keep calling ``connection.close()`` when they are done;
+    on a pooled connection that hands the connection back to the pool
+    instead of tearing down the TCP socket.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return self._raw.cursor(*args, **kwargs)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, self._created_at)
+
+    def invalidate(self):
+        """Drop the underlying connection instead of returning it to the pool."""
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, self._created_at, discard=True)
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections.
+
+    Args:
+        connect (callable): Factory returning a new raw connection.
+        pool_size (int): Connections kept open while idle.
+        max_overflow (int): Extra connections allowed under load; these are
+            closed again when checked in while the pool is full.
+        timeout (float): Seconds to wait for a free connection.
+        recycle (int): Maximum lifetime of a connection in seconds (-1 = off).
+        idle_timeout (int): Close connections idle longer than this (-1 = off).
+        pre_ping (bool): Ping connections on checkout and replace dead ones.
+        session_init (list): (statement, params) pairs run once on every new
+            connection.
+    """
+
+    def __init__(
+        self,
+        connect,
+        pool_size=5,
+        max_overflow=10,
+        timeout=30.0,
+        recycle=3600,
+        idle_timeout=-1,
+        pre_ping=True,
+        session_init=None,
+    ):
+        self._connect = connect
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.session_init = list(session_init or [])
+
+        self._cond = threading.Condition()
+        # Each idle entry is (raw_connection, created_at, checked_in_at)
+        self._idle = deque()
+        self._open = 0
+        self._checked_out = 0
+        self._stats = {
+            "checkouts": 0,
+            "checkins": 0,
+            "connects": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "exhausted": 0,
+            "recycled": 0,
+            "invalidated": 0,
+            "overflow_closed": 0,
+            "peak_checked_out": 0,
+        }
+
+    # --- Checkout / checkin ---
+    def acquire(self):
+        waited_from = None
+        while True:
+            raw, created_at, waited_from = self._reserve(waited_from)
+            if raw is None:
+                try:
+                    raw = self._new_connection()
+                except Exception:
+                    self._unreserve()
+                    raise
+                created_at = time.monotonic()
+            elif self.pre_ping and not self._ping(raw):
+                # Dead connection (server restart, wait_timeout): drop it and
+                # try again with the next idle one or a fresh connection.
+                with self._cond:
+                    self._stats["invalidated"] += 1
+                    self._stats["checkouts"] -= 1
+                    self._checked_out -= 1
+                    self._discard(raw)
+                    self._cond.notify()
+                continue
+            return PooledConnection(self, raw, created_at)
+
+    def _reserve(self, waited_from):
+        """Claim an idle connection or a slot for a new one.
+
+        Returns (raw, created_at, waited_from); raw is None when the caller
+        should open a new connection in the reserved slot.
+        """
+        deadline = None if waited_from is None else waited_from + self.timeout
+        with self._cond:
+            while True:
+                while self._idle:
+                    raw, created_at, checked_in_at = self._idle.pop()
+                    if self._is_stale(created_at, checked_in_at):
+                        self._stats["recycled"] += 1
+                        self._discard(raw)
+                        continue
+                    self._mark_checkout(waited_from)
+                    return raw, created_at, waited_from
+
+                if self._open < self.pool_size + self.max_overflow:
+                    self._open += 1
+                    self._mark_checkout(waited_from)
+                    return None, None, waited_from
+
+                if deadline is None:
+                    waited_from = time.monotonic()
+                    deadline = waited_from + self.timeout
+                    self._stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["exhausted"] += 1
+                    self._stats["wait_time"] += time.monotonic() - waited_from
+                    raise PoolExhaustedError(
+                        f"Connection pool exhausted ({self._open} open, "
+                        f"timeout {self.timeout}s)"
+                    )
+                self._cond.wait(remaining)
+
+    def _mark_checkout(self, waited_from):
+        # Caller must hold the lock
+        if waited_from is not None:
+            self._stats["wait_time"] += time.monotonic() - waited_from
+        self._checked_out += 1
+        self._stats["checkouts"] += 1
+        self._stats["peak_checked_out"] = max(
+            self._stats["peak_checked_out"], self._checked_out
+        )
+
+    def _unreserve(self):
+        with self._cond:
+            self._open -= 1
+            self._checked_out -= 1
+            self._cond.notify()
+
+    def release(self, raw, created_at, discard=False):
+        # End whatever transaction the caller left open so the next
+        # borrower never sees a stale snapshot or uncommitted writes.
+        if not discard:
+            try:
+                if raw.in_transaction:
+                    raw.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._checked_out -= 1
+            self._stats["checkins"] += 1
+            if discard:
+                self._stats["invalidated"] += 1
+                self._discard(raw)
+            elif len(self._idle) >= self.pool_size:
+                self._stats["overflow_closed"] += 1
+                self._discard(raw)
+            else:
+                self._idle.append((raw, created_at, time.monotonic()))
+            self._cond.notify()
+
+    # --- Helpers ---
+    def _new_connection(self):
+        raw = self._connect()
+        if self.session_init:
+            try:
+                cursor = raw.cursor()
+                for statement, params in self.session_init:
+                    cursor.execute(statement, params)
+                cursor.close()
+            except Exception:
+                raw.close()
+                raise
+        with self._cond:
+            self._stats["connects"] += 1
+        return raw
+
+    def _is_stale(self, created_at, checked_in_at):
+        now = time.monotonic()
+        if self.recycle >= 0 and now - created_at > self.recycle:
+            return True
+        if self.idle_timeout >= 0 and now - checked_in_at > self.idle_timeout:
+            return True
+        return False
+
+    def _ping(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, raw):
+        # Caller must hold the lock
+        self._open -= 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def dispose(self):
+        """Close every idle connection (checked-out ones close on checkin)."""
+        with self._cond:
+            while self._idle:
+                raw, _, _ = self._idle.pop()
+                self._discard(raw)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "pool_size": self.pool_size,
+                    "max_overflow": self.max_overflow,
+                    "open": self._open,
+                    "idle": len(self._idle),
+                    "checked_out": self._checked_out,
+                    "overflow": max(0, self._open - self.pool_size),
+                }
+            )
+        return stats
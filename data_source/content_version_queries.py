@@ -0,0 +1,76 @@
+from data_source.db_connection import (
+    call_after_commit,
+    get_connection,
+    get_standalone_connection,
+)
+
+DB_CONN_ERROR = "[DB ERROR] Could not connect to database."
+
+
+def get_content_versions(names):
+    """Current change counters for the given kinds of content.
+
+    The counters are bumped by bump_content_version() after every write
+    that changes what a page shows. The database's current date is included
+    because bulletin listings drop activities once their date has passed.
+
+    Returns:
+        tuple: (dict of name -> version, current date), or None on error
+    """
+    connection = get_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return None
+    cursor = connection.cursor()
+    try:
+        format_strings = ",".join(["%s"] * len(names))
+        cursor.execute(
+            f"""
+            SELECT CURDATE(), name, version FROM content_version
+            WHERE name IN ({format_strings})
+            """,
+            tuple(names),
+        )
+        rows = cursor.fetchall()
+        if len(rows) != len(set(names)):
+            # Missing rows never get bumped, so they cannot be relied on
+            print(f"[DB ERROR] Missing content versions for {sorted(names)}")
+            return None
+        return {name: version for _, name, version in rows}, rows[0][0]
+    except Exception as e:
+        print(f"[DB ERROR] Error reading content versions: {e}")
+        return None
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def bump_content_version(name):
+    """Change the version of name once the current writes are committed.
+
+    The counter is incremented on a separate connection that commits
+    straight away, so its row is locked for one statement rather than
+    until the writing request ends. Writers never queue on it behind
+    each other's requests.
+    """
+    call_after_commit(lambda: _increment_content_version(name))
+
+
+def _increment_content_version(name):
+    connection = get_standalone_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "UPDATE content_version SET version = version + 1 WHERE name = %s",
+            (name,),
+        )
+        connection.commit()
+    except Exception as e:
+        print(f"[DB ERROR] Error bumping content version: {e}")
+        connection.rollback()
+    finally:
+        cursor.close()
+        connection.close()
@@ -1,20 +1,306 @@
 import os
+import threading
+from contextlib import contextmanager
 
 import mysql.connector
+from flask import abort, g, has_app_context
 from mysql.connector import Error
 
+from data_source.connection_pool import ConnectionPool, PoolExhaustedError
 
-def get_connection():
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _connect():
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        user=os.getenv("DB_USER", ""),
+        password=os.getenv("DB_PASSWORD", ""),
+        database=os.getenv("DB_NAME", ""),
+        autocommit=_env_bool("DB_AUTOCOMMIT", False),
+        # Connections are shared between queries, so drain any rows a
+        # previous cursor left unread instead of raising on the next one.
+        consume_results=True,
+    )
+
+
+def _create_pool():
+    session_init = []
+    # Unset by default so sessions keep the server's time zone
+    time_zone = os.getenv("DB_TIME_ZONE")
+    if time_zone:
+        session_init.append(("SET time_zone = %s", (time_zone,)))
+    return ConnectionPool(
+        _connect,
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_POOL_MAX_OVERFLOW", 10),
+        timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        recycle=_env_int("DB_POOL_RECYCLE", 3600),
+        idle_timeout=_env_int("DB_POOL_IDLE_TIMEOUT", 600),
+        pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+        session_init=session_init,
+    )
+
+
+def get_pool():
+    """Return this process's connection pool, creating it on first use.
+
+    Gunicorn workers fork after import, so a pool inherited from another
+    process is discarded rather than sharing its sockets.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = _create_pool()
+                _pool_pid = pid
+    return _pool
+
+
+def get_pool_stats():
+    """Checkout/wait/exhaustion counters for sizing the pool."""
+    return get_pool().stats()
+
+
+class RequestConnection:
+    """Connection shared by every query within one application context.
+
+    Query modules still call ``commit()`` and ``close()`` after each
+    statement; here ``commit()`` only records that there is work to commit
+    and ``close()`` is a no-op. The unit of work is committed once before
+    the response is sent (or rolled back if the request failed), and the
+    connection is returned to the pool at teardown.
+
+    A query's ``rollback()`` only undoes that query's own statements:
+    while earlier writes are pending, every query starts at a savepoint
+    and rolls back to it.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.dirty = False
+        self.rollback_only = False
+        self.depth = 0
+        self.after_commit = []
+        self._query_savepoint = None
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return self._connection.cursor(*args, **kwargs)
+
+    def commit(self):
+        self.dirty = True
+
+    def rollback(self):
+        self.rollback_to(self._query_savepoint)
+
+    def begin_query(self):
+        self._query_savepoint = self.savepoint("request_query")
+
+    def savepoint(self, name):
+        """Set savepoint name if earlier writes are pending.
+
+        Returns:
+            tuple: State to pass to rollback_to(), or None if there was
+            nothing to protect and rollback_to() may end the transaction
+        """
+        if not (self.dirty and self._connection.in_transaction):
+            return None
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {name}")
+        finally:
+            cursor.close()
+        return name, len(self.after_commit)
+
+    def rollback_to(self, savepoint):
+        """Undo the writes made since savepoint, or all of them if None."""
+        self._query_savepoint = None
+        if savepoint is None:
+            self._connection.rollback()
+            self.dirty = False
+            self.after_commit = []
+            return
+        name, callbacks = savepoint
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        finally:
+            cursor.close()
+        del self.after_commit[callbacks:]
+
+    def close(self):
+        pass
+
+    def commit_now(self):
+        self._connection.commit()
+        self.dirty = False
+        self._query_savepoint = None
+        callbacks, self.after_commit = self.after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[DB ERROR] after-commit callback failed: {e}")
+
+    def finish(self, commit=True):
+        try:
+            if commit and self.dirty and not self.rollback_only:
+                self.commit_now()
+        except Error as e:
+            print(f"[DB ERROR] Error committing request: {e}")
+        finally:
+            self.dirty = False
+            self.after_commit = []
+            self._connection.close()
+
+
+def _checkout():
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            user=os.getenv("DB_USER", ""),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_NAME", ""),
-        )
-        if connection.is_connected():
-            return connection
-        return None  # Return None if not connected
-    except Error as e:
+        # Liveness is checked by the pool's pre-ping on checkout
+        return get_pool().acquire()
+    except (Error, PoolExhaustedError) as e:
         print(f"[DB ERROR] {e}")
         return None
+
+
+def get_connection():
+    if not has_app_context():
+        return _checkout()
+    connection = g.get("_db_connection")
+    if connection is None:
+        pooled = _checkout()
+        if pooled is None:
+            return None
+        connection = g._db_connection = RequestConnection(pooled)
+    connection.begin_query()
+    return connection
+
+
+def get_standalone_connection():
+    """Pooled connection outside the current request's unit of work.
+
+    Reads on it see everything committed so far instead of the request's
+    REPEATABLE READ snapshot, and its writes are committed as soon as the
+    caller commits rather than at request teardown. The caller commits or
+    rolls back and closes it itself. Returns None if no connection could
+    be checked out.
+    """
+    return _checkout()
+
+
+@contextmanager
+def transaction():
+    """Commit every query inside the block atomically.
+
+    Usage:
+        with transaction():
+            update_a(...)
+            update_b(...)
+
+    Pending writes are committed when the outermost block exits and rolled
+    back if it raises; writes made before the block stay pending. Requires an application context; raises Error if no
+    database connection could be checked out.
+    """
+    if not has_app_context():
+        raise RuntimeError("transaction() requires an application context")
+    connection = get_connection()
+    if connection is None:
+        raise Error(msg="transaction() could not get a database connection")
+    savepoint = (
+        connection.savepoint("request_transaction") if connection.depth == 0 else None
+    )
+    connection.depth += 1
+    try:
+        yield connection
+    except Exception:
+        connection.depth -= 1
+        if connection.depth == 0:
+            connection.rollback_to(savepoint)
+            connection.rollback_only = False
+        else:
+            connection.rollback_only = True
+        raise
+    connection.depth -= 1
+    if connection.depth == 0:
+        if connection.rollback_only:
+            connection.rollback_to(savepoint)
+            connection.rollback_only = False
+        elif connection.dirty:
+            connection.commit_now()
+
+
+def call_after_commit(callback):
+    """Run callback once the current request's writes are committed.
+
+    Use this for side effects that must not be seen before the data is,
+    such as invalidating a cache. Callbacks are dropped if the writes are
+    rolled back. Outside a request there is nothing pending, so callback
+    runs immediately.
+    """
+    connection = g.get("_db_connection") if has_app_context() else None
+    if connection is None or not connection.dirty:
+        callback()
+    else:
+        connection.after_commit.append(callback)
+
+
+def _commit_request(response):
+    connection = g.get("_db_connection")
+    if connection is None:
+        return response
+    if response.status_code >= 500:
+        connection.rollback_only = True
+    elif connection.dirty and not connection.rollback_only:
+        # Commit before the response goes out, so a failed commit is
+        # reported as an error instead of a success that was not saved
+        try:
+            connection.commit_now()
+        except Error as e:
+            print(f"[DB ERROR] Error committing request: {e}")
+            connection.rollback_only = True
+            abort(500)
+    return response
+
+
+def _release_request_connection(exc=None):
+    connection = g.pop("_db_connection", None)
+    if connection is not None:
+        connection.finish(commit=exc is None)
+
+
+def release_connection():
+    """Commit the current request's writes and return its connection now.
+
+    For long-lived responses such as event streams, which would otherwise
+    keep a pooled connection checked out until teardown. A later
+    get_connection() in the same request checks out a new one.
+    """
+    if has_app_context():
+        _release_request_connection()
+
+
+def init_db_connection(app):
+    """Commit the request's unit of work before the response is sent and
+    return its connection at teardown."""
+    app.after_request(_commit_request)
+    app.teardown_appcontext(_release_request_connection)
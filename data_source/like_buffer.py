@@ -0,0 +1,250 @@
+import atexit
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBuffer:
+    """Write-behind buffer that coalesces like/unlike toggles per post.
+
+    Each toggle is recorded in memory and answered straight away with an
+    optimistic like count; a background thread writes everything buffered
+    during the last ``window`` seconds in one batch. A like followed by an
+    unlike from the same user within the window cancels out and is never
+    written.
+
+    The first toggle by a user on a post reads that user's persisted like
+    state and the post's like count (a plain read, no row lock). Reads never
+    overlap a flush, so the state they see is never missing a batch that is
+    half written.
+
+    Toggles are acknowledged before they are written, so one that cannot be
+    written is lost although its user was told it succeeded. Those are
+    logged as errors and counted in stats()["lost_toggles"].
+
+    Args:
+        read_states (callable): (post_ids, user_id) -> dict of post id ->
+            (like_count, liked) for the posts that exist. It must read
+            committed data on its own connection; a request's snapshot can
+            predate the last flush.
+        write_batch (callable): list of (post_id, user_id, liked) -> (dict of
+            post id -> net change applied to its like count, list of the
+            toggles that could not be written).
+        window (float): Seconds toggles are buffered before a flush.
+        max_batch (int): Flush early once this many toggles are buffered.
+        on_flush (callable): Called with the dict write_batch returned.
+    """
+
+    def __init__(
+        self, read_states, write_batch, window=0.5, max_batch=500, on_flush=None
+    ):
+        self._read_states = read_states
+        self._write_batch = write_batch
+        self.window = window
+        self.max_batch = max_batch
+        self._on_flush = on_flush
+
+        self._lock = threading.Lock()
+        # Held while a batch is written and while persisted state is read
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        # post_id -> {"base": like_count read from the DB, "delta": buffered
+        # change, "users": {user_id: [persisted_liked, desired_liked]}}
+        self._posts = {}
+        self._buffered = 0
+        self._stats = {
+            "toggles": 0,
+            "state_reads": 0,
+            "collapsed": 0,
+            "flushes": 0,
+            "rows_written": 0,
+            "lost_toggles": 0,
+            "flush_errors": 0,
+        }
+
+    def toggle(self, post_id, user_id, liked):
+        """Record that user_id likes (liked=True) or unlikes post_id.
+
+        Returns:
+            tuple: (changed, like_count). changed is False if the user's like
+            state already matched; like_count includes buffered toggles and
+            is None if the post does not exist.
+        """
+        self._ensure_worker()
+        with self._lock:
+            post = self._posts.get(post_id)
+            entry = post["users"].get(user_id) if post else None
+            if entry is not None:
+                return self._apply(post, entry, liked)
+
+        results, _ = self.toggle_many(user_id, [(post_id, liked)])
+        return results[0]
+
+    def toggle_many(self, user_id, toggles, post_ids=()):
+        """Apply several toggles by one user with a single state read.
+
+        The like state of post_ids is reported alongside, so a client can
+        refresh the posts it shows in the same call.
+
+        Args:
+            toggles (list): (post_id, liked) pairs, applied in order
+            post_ids (iterable): Posts to report on without changing them
+
+        Returns:
+            tuple: (list of (changed, like_count) per toggle as for toggle(),
+            dict of post id -> (like_count, liked) for every existing post)
+        """
+        self._ensure_worker()
+        wanted = sorted({post_id for post_id, _ in toggles} | set(post_ids))
+        if not wanted:
+            return [], {}
+
+        with self._flush_lock:
+            persisted = self._read_states(wanted, user_id)
+            with self._lock:
+                self._stats["state_reads"] += 1
+                results = []
+                for post_id, liked in toggles:
+                    state = persisted.get(post_id)
+                    if state is None:
+                        results.append((False, None))
+                        continue
+                    post = self._posts.setdefault(
+                        post_id, {"base": state[0], "delta": 0, "users": {}}
+                    )
+                    entry = post["users"].setdefault(user_id, [state[1], state[1]])
+                    results.append(self._apply(post, entry, liked))
+                states = {
+                    post_id: self._overlay(post_id, user_id, *state)
+                    for post_id, state in persisted.items()
+                }
+        return results, states
+
+    def pending_state(self, post_id, user_id, like_count, liked):
+        """Persisted (like_count, liked) of post_id with buffered toggles applied."""
+        with self._lock:
+            return self._overlay(post_id, user_id, like_count, liked)
+
+    def pending_toggles(self, user_id):
+        """Sorted (post_id, liked) pairs user_id toggled that are not written yet."""
+        pending = []
+        with self._lock:
+            for post_id, post in self._posts.items():
+                entry = post["users"].get(user_id)
+                if entry is not None and entry[0] != entry[1]:
+                    pending.append((post_id, entry[1]))
+        return tuple(sorted(pending))
+
+    def _overlay(self, post_id, user_id, like_count, liked):
+        # Caller must hold the lock
+        post = self._posts.get(post_id)
+        if post is None:
+            return like_count, liked
+        entry = post["users"].get(user_id)
+        return (
+            max(post["base"] + post["delta"], 0),
+            entry[1] if entry is not None else liked,
+        )
+
+    def _apply(self, post, entry, liked):
+        # Caller must hold the lock
+        changed = entry[1] != liked
+        if changed:
+            entry[1] = liked
+            post["delta"] += 1 if liked else -1
+            self._stats["toggles"] += 1
+            if entry[0] == entry[1]:
+                # Like/unlike pair cancelled out before it was written
+                self._stats["collapsed"] += 1
+                self._buffered -= 1
+            else:
+                self._buffered += 1
+            if self._buffered >= self.max_batch:
+                self._wake.set()
+        return changed, max(post["base"] + post["delta"], 0)
+
+    def flush(self):
+        """Write every buffered toggle now.
+
+        Returns:
+            dict: post id -> net change applied to its like count
+        """
+        with self._flush_lock:
+            with self._lock:
+                posts, self._posts = self._posts, {}
+                self._buffered = 0
+            changes = [
+                (post_id, user_id, desired)
+                for post_id, post in posts.items()
+                for user_id, (persisted, desired) in post["users"].items()
+                if persisted != desired
+            ]
+            if not changes:
+                return {}
+            try:
+                deltas, lost = self._write_batch(changes)
+            except Exception:
+                self._record_lost(changes)
+                raise
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["rows_written"] += len(changes) - len(lost)
+            if lost:
+                self._record_lost(lost)
+        if deltas and self._on_flush is not None:
+            self._on_flush(deltas)
+        return deltas
+
+    def _record_lost(self, changes):
+        with self._lock:
+            self._stats["lost_toggles"] += len(changes)
+        logger.error(
+            "Like buffer could not write %d acknowledged toggles "
+            "(post_id, user_id, liked): %s",
+            len(changes),
+            changes[:20],
+        )
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid:
+                return
+            # A forked worker must not write toggles its parent buffered
+            self._posts = {}
+            self._buffered = 0
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="like-buffer", daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.window)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                with self._lock:
+                    self._stats["flush_errors"] += 1
+                print(f"[DB ERROR] Error flushing likes: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "window": self.window,
+                    "buffered": self._buffered,
+                    "buffered_posts": len(self._posts),
+                }
+            )
+        return stats
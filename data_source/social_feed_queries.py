@@ -2,14 +2,56 @@ import os
 
 from werkzeug.utils import secure_filename
 
-from data_source.db_connection import get_connection
+from data_source.content_version_queries import bump_content_version
+from data_source.db_connection import get_connection, get_standalone_connection
 
 DB_CONN_ERROR = "[DB ERROR] Could not connect to database."
 
-SELECT_LIKE_USER_IDS_QUERY = "SELECT like_user_ids FROM feed WHERE id = %s"
-
-
-def get_all_posts():
+# Like count and "liked by viewer" flag for feed rows aliased as f. The count
+# is the denormalized feed.like_count; the flag is a primary-key lookup on
+# post_like and takes the viewer's user ID as a parameter.
+POST_LIKE_COLUMNS = """
+    f.like_count AS likes,
+    EXISTS(
+        SELECT 1 FROM post_like pl WHERE pl.feed_id = f.id AND pl.user_id = %s
+    ) AS liked
+"""
+
+
+def _keyset_clause(
+    before_id, limit, params, where=False, after_id=None, oldest_first=False
+):
+    """SQL for one keyset page of feed rows, newest first.
+
+    Appends its parameters to params. Pass where=True when the query has
+    no WHERE clause yet; after_id limits the page to posts newer than it,
+    and oldest_first pages through them in the order they were posted.
+    """
+    conditions = []
+    if before_id is not None:
+        conditions.append("f.id < %s")
+        params.append(before_id)
+    if after_id is not None:
+        conditions.append("f.id > %s")
+        params.append(after_id)
+    clause = ""
+    if conditions:
+        clause += f" {'WHERE' if where else 'AND'} " + " AND ".join(conditions)
+    clause += " ORDER BY f.id ASC" if oldest_first else " ORDER BY f.id DESC"
+    if limit is not None:
+        clause += " LIMIT %s"
+        params.append(limit)
+    return clause
+
+
+def get_all_posts(
+    viewer_id=None,
+    before_id=None,
+    limit=None,
+    comments_per_post=None,
+    after_id=None,
+    oldest_first=False,
+):
     connection = get_connection()
     if connection is None:
         print(DB_CONN_ERROR)
@@ -17,41 +59,35 @@ def get_all_posts():
 
     cursor = connection.cursor(dictionary=True)
     try:
-        query = """
-            SELECT f.id, f.user_id, f.caption, f.image_path, f.like_user_ids, u.name as user_name, u.profile_picture
+        params = [viewer_id]
+        page = _keyset_clause(
+            before_id,
+            limit,
+            params,
+            where=True,
+            after_id=after_id,
+            oldest_first=oldest_first,
+        )
+        query = f"""
+            SELECT f.id, f.user_id, f.caption, f.image_path, u.name as user_name, u.profile_picture,
+                {POST_LIKE_COLUMNS}
             FROM feed f
             JOIN user u ON f.user_id = u.id
-            ORDER BY f.id DESC
+            {page}
         """
-        cursor.execute(query)
+        cursor.execute(query, tuple(params))
         posts = cursor.fetchall()
+        comments_by_post, comment_counts = get_comments_for_posts(
+            connection, [post["id"] for post in posts], comments_per_post
+        )
         for post in posts:
-            # Get comments for each post (no created_at)
-            comment_cursor = connection.cursor(dictionary=True)
-            comment_query = """
-                SELECT c.id, c.comments, u.name as user_name, u.profile_picture
-                FROM comments c
-                JOIN user u ON c.user_id = u.id
-                WHERE c.feed_id = %s
-                ORDER BY c.id ASC
-            """
-            comment_cursor.execute(comment_query, (post["id"],))
-            comments = comment_cursor.fetchall()
-            post["comments"] = [
-                {
-                    "id": c["id"],
-                    "user": c["user_name"],
-                    "content": c["comments"],
-                    "profile_picture": c.get("profile_picture", ""),
-                }
-                for c in comments
-            ]
-            comment_cursor.close()
+            post["comments"] = comments_by_post.get(post["id"], [])
+            post["comment_count"] = comment_counts.get(post["id"], 0)
             post["feed_id"] = post["id"]
             post["user"] = post["user_name"]
             post["content"] = post["caption"]
             post["image_url"] = post["image_path"]
-            post["likes"] = get_like_count(post["id"])
+            post["liked"] = bool(post["liked"])
             post["profile_picture"] = post.get("profile_picture", "")
         return posts
     except Exception as e:
@@ -62,6 +98,260 @@ def get_all_posts():
         connection.close()
 
 
+def iter_posts(
+    viewer_id=None,
+    user_id=None,
+    before_id=None,
+    comments_per_post=None,
+    batch_size=50,
+):
+    """Yield feed rows newest first, reading them one keyset batch at a time.
+
+    At most batch_size rows (and their comments) are held at once, however
+    large the feed is. Each batch is read in full before its rows are
+    yielded, so the request's shared connection is free for other queries
+    while the caller works through them; a cursor left open across yields
+    would be drained by the next query on it (consume_results).
+
+    Args:
+        user_id (int): Only yield posts by this user
+        comments_per_post (int): Attach this many newest comments and the
+            comment count to each row (None = no comments)
+
+    Yields:
+        dict: Post row with likes, liked and, if requested, comments
+    """
+    while True:
+        connection = get_connection()
+        if connection is None:
+            print(DB_CONN_ERROR)
+            return
+        cursor = connection.cursor(dictionary=True)
+        try:
+            params = [viewer_id]
+            where = ""
+            if user_id is not None:
+                where = "WHERE f.user_id = %s"
+                params.append(user_id)
+            page = _keyset_clause(before_id, batch_size, params, where=not where)
+            cursor.execute(
+                f"""
+                SELECT f.id, f.user_id, f.caption, f.image_path, u.name as user_name, u.profile_picture,
+                    {POST_LIKE_COLUMNS}
+                FROM feed f
+                JOIN user u ON f.user_id = u.id
+                {where}
+                {page}
+                """,
+                tuple(params),
+            )
+            rows = cursor.fetchall()
+            if comments_per_post is not None:
+                comments_by_post, comment_counts = get_comments_for_posts(
+                    connection, [row["id"] for row in rows], comments_per_post
+                )
+                for row in rows:
+                    row["comments"] = comments_by_post.get(row["id"], [])
+                    row["comment_count"] = comment_counts.get(row["id"], 0)
+        except Exception as e:
+            print(f"[DB ERROR] Error streaming posts: {e}")
+            return
+        finally:
+            cursor.close()
+            connection.close()
+
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        before_id = rows[-1]["id"]
+
+
+def _comment_from_row(c):
+    return {
+        "id": c["id"],
+        "user": c["user_name"],
+        "content": c["comments"],
+        "profile_picture": c.get("profile_picture", ""),
+    }
+
+
+def get_comments_for_posts(connection, post_ids, per_post=None):
+    """Fetch the comments of several posts in one query.
+
+    Args:
+        per_post (int): Only fetch the newest this many comments of each post
+
+    Returns:
+        tuple: (post id -> list of comment dicts oldest first,
+                post id -> total number of comments on the post)
+    """
+    comments_by_post = {}
+    comment_counts = {}
+    if not post_ids:
+        return comments_by_post, comment_counts
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        format_strings = ",".join(["%s"] * len(post_ids))
+        if per_post is None:
+            query = f"""
+                SELECT c.id, c.feed_id, c.comments, u.name as user_name, u.profile_picture
+                FROM comments c
+                JOIN user u ON c.user_id = u.id
+                WHERE c.feed_id IN ({format_strings})
+                ORDER BY c.id ASC
+            """
+            params = tuple(post_ids)
+        else:
+            # Rank each post's comments newest first and keep the top few;
+            # the per-post total comes along with every kept row.
+            query = f"""
+                SELECT id, feed_id, comments, user_name, profile_picture, comment_count
+                FROM (
+                    SELECT c.id, c.feed_id, c.comments, u.name as user_name, u.profile_picture,
+                        ROW_NUMBER() OVER (PARTITION BY c.feed_id ORDER BY c.id DESC) AS rn,
+                        COUNT(*) OVER (PARTITION BY c.feed_id) AS comment_count
+                    FROM comments c
+                    JOIN user u ON c.user_id = u.id
+                    WHERE c.feed_id IN ({format_strings})
+                ) ranked
+                WHERE rn <= %s
+                ORDER BY id ASC
+            """
+            params = tuple(post_ids) + (per_post,)
+        cursor.execute(query, params)
+        for c in cursor.fetchall():
+            comments_by_post.setdefault(c["feed_id"], []).append(_comment_from_row(c))
+            if per_post is None:
+                comment_counts[c["feed_id"]] = comment_counts.get(c["feed_id"], 0) + 1
+            else:
+                comment_counts[c["feed_id"]] = c["comment_count"]
+        return comments_by_post, comment_counts
+    finally:
+        cursor.close()
+
+
+def get_feed_change_marker(post_ids):
+    """Cheap summary of what a feed client could have missed.
+
+    Returns:
+        tuple: (newest post id, newest comment id on post_ids, fingerprint
+        of the like counts of post_ids), or None on error
+    """
+    connection = get_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return None
+    cursor = connection.cursor()
+    try:
+        if post_ids:
+            format_strings = ",".join(["%s"] * len(post_ids))
+            comment_query = f"""
+                SELECT COALESCE(MAX(id), 0) FROM comments WHERE feed_id IN ({format_strings})
+            """
+            like_query = f"""
+                SELECT BIT_XOR(CRC32(CONCAT(id, ':', like_count)))
+                FROM feed WHERE id IN ({format_strings})
+            """
+        else:
+            comment_query = like_query = "SELECT 0"
+        cursor.execute(
+            f"""
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM feed),
+                ({comment_query}),
+                ({like_query})
+            """,
+            tuple(post_ids) * 2,
+        )
+        max_post_id, max_comment_id, like_token = cursor.fetchone()
+        return max_post_id, max_comment_id, str(like_token or 0)
+    except Exception as e:
+        print(f"[DB ERROR] Error checking feed changes: {e}")
+        return None
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def get_comments_since(post_ids, after_id, limit=None):
+    """Comments on post_ids newer than after_id, oldest first.
+
+    Returns:
+        dict: post id -> list of comment dicts
+    """
+    comments_by_post = {}
+    if not post_ids:
+        return comments_by_post
+    connection = get_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return comments_by_post
+    cursor = connection.cursor(dictionary=True)
+    try:
+        format_strings = ",".join(["%s"] * len(post_ids))
+        params = [*post_ids, after_id]
+        query = f"""
+            SELECT c.id, c.feed_id, c.comments, u.name as user_name, u.profile_picture
+            FROM comments c
+            JOIN user u ON c.user_id = u.id
+            WHERE c.feed_id IN ({format_strings}) AND c.id > %s
+            ORDER BY c.id ASC
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        cursor.execute(query, tuple(params))
+        for c in cursor.fetchall():
+            comments_by_post.setdefault(c["feed_id"], []).append(_comment_from_row(c))
+        return comments_by_post
+    except Exception as e:
+        print(f"[DB ERROR] Error fetching new comments: {e}")
+        return comments_by_post
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def get_comments_page(post_id, before_id=None, limit=None):
+    """Fetch one page of a post's comments, newest first.
+
+    Args:
+        before_id (int): Only return comments older than this comment ID
+        limit (int): Maximum number of comments
+
+    Returns:
+        list: comment dicts, newest first
+    """
+    connection = get_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return []
+    cursor = connection.cursor(dictionary=True)
+    try:
+        params = [post_id]
+        query = """
+            SELECT c.id, c.feed_id, c.comments, u.name as user_name, u.profile_picture
+            FROM comments c
+            JOIN user u ON c.user_id = u.id
+            WHERE c.feed_id = %s
+        """
+        if before_id is not None:
+            query += " AND c.id < %s"
+            params.append(before_id)
+        query += " ORDER BY c.id DESC"
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        cursor.execute(query, tuple(params))
+        return [_comment_from_row(c) for c in cursor.fetchall()]
+    except Exception as e:
+        print(f"[DB ERROR] Error fetching comments: {e}")
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+
 def add_post(user_id, content, image_url=None):
     connection = get_connection()
     if connection is None:
@@ -70,12 +360,13 @@ def add_post(user_id, content, image_url=None):
     cursor = connection.cursor()
     try:
         query = """
-            INSERT INTO feed (user_id, caption, image_path, like_user_ids)
-            VALUES (%s, %s, %s, '')
+            INSERT INTO feed (user_id, caption, image_path)
+            VALUES (%s, %s, %s)
         """
         cursor.execute(query, (user_id, content, image_url))
         connection.commit()
-        return True
+        bump_content_version("feed")
+        return cursor.lastrowid
     except Exception as e:
         print(f"[DB ERROR] Error adding post: {e}")
         return False
@@ -97,7 +388,8 @@ def add_comment(feed_id, user_id, content):
         """
         cursor.execute(query, (feed_id, user_id, content))
         connection.commit()
-        return True
+        bump_content_version("feed")
+        return cursor.lastrowid
     except Exception as e:
         print(f"[DB ERROR] Error adding comment: {e}")
         return False
@@ -106,28 +398,29 @@ def add_comment(feed_id, user_id, content):
         connection.close()
 
 
-def get_posts_by_user(username):
+def get_posts_by_user(username, viewer_id=None):
     connection = get_connection()
     if connection is None:
         print(DB_CONN_ERROR)
         return []
     cursor = connection.cursor(dictionary=True)
     try:
-        query = """
-            SELECT f.id, f.user_id, f.caption, f.image_path, f.like_user_ids, u.name as user_name
+        query = f"""
+            SELECT f.id, f.user_id, f.caption, f.image_path, u.name as user_name,
+                {POST_LIKE_COLUMNS}
             FROM feed f
             JOIN user u ON f.user_id = u.id
             WHERE u.name = %s
             ORDER BY f.id DESC
         """
-        cursor.execute(query, (username,))
+        cursor.execute(query, (viewer_id, username))
         posts = cursor.fetchall()
         for post in posts:
             post["feed_id"] = post["id"]
             post["user"] = post["user_name"]
             post["content"] = post["caption"]
             post["image_url"] = post["image_path"]
-            post["likes"] = get_like_count(post["id"])
+            post["liked"] = bool(post["liked"])
         return posts
     except Exception as e:
         print(f"[DB ERROR] Error fetching user posts: {e}")
@@ -137,28 +430,48 @@ def get_posts_by_user(username):
         connection.close()
 
 
-def get_posts_by_user_id(user_id):
+def get_posts_by_user_id(
+    user_id,
+    viewer_id=None,
+    before_id=None,
+    limit=None,
+    with_comments=False,
+    comments_per_post=None,
+):
     connection = get_connection()
     if connection is None:
         print(DB_CONN_ERROR)
         return []
     cursor = connection.cursor(dictionary=True)
     try:
-        query = """
-            SELECT f.id, f.user_id, f.caption, f.image_path, f.like_user_ids, u.name as user_name, u.profile_picture
+        params = [viewer_id, user_id]
+        page = _keyset_clause(before_id, limit, params)
+        query = f"""
+            SELECT f.id, f.user_id, f.caption, f.image_path, u.name as user_name, u.profile_picture,
+                {POST_LIKE_COLUMNS}
             FROM feed f
             JOIN user u ON f.user_id = u.id
             WHERE f.user_id = %s
-            ORDER BY f.id DESC
+            {page}
         """
-        cursor.execute(query, (user_id,))
+        cursor.execute(query, tuple(params))
         posts = cursor.fetchall()
+        comments_by_post, comment_counts = (
+            get_comments_for_posts(
+                connection, [post["id"] for post in posts], comments_per_post
+            )
+            if with_comments
+            else ({}, {})
+        )
         for post in posts:
+            if with_comments:
+                post["comments"] = comments_by_post.get(post["id"], [])
+                post["comment_count"] = comment_counts.get(post["id"], 0)
             post["feed_id"] = post["id"]
             post["user"] = post["user_name"]
             post["content"] = post["caption"]
             post["image_url"] = post["image_path"]
-            post["likes"] = get_like_count(post["id"])
+            post["liked"] = bool(post["liked"])
             post["profile_picture"] = post.get("profile_picture", "")
         return posts
     except Exception as e:
@@ -182,48 +495,6 @@ def add_post_to_db(user_id, content, image_file=None):
     return add_post(user_id, content, image_url)
 
 
-def increment_like(post_id):
-    connection = get_connection()
-    if connection is None:
-        print(DB_CONN_ERROR)
-        return False
-    cursor = connection.cursor()
-    try:
-        cursor.execute(
-            "UPDATE feed SET like_user_ids = CONCAT(like_user_ids, %s) WHERE id = %s",
-            (str(post_id), post_id),
-        )
-        connection.commit()
-        return True
-    except Exception as e:
-        print(f"[DB ERROR] Error incrementing like: {e}")
-        return False
-    finally:
-        cursor.close()
-        connection.close()
-
-
-def decrement_like(post_id):
-    connection = get_connection()
-    if connection is None:
-        print(DB_CONN_ERROR)
-        return False
-    cursor = connection.cursor()
-    try:
-        cursor.execute(
-            "UPDATE feed SET like_user_ids = REPLACE(like_user_ids, %s, '') WHERE id = %s",
-            (str(post_id), post_id),
-        )
-        connection.commit()
-        return True
-    except Exception as e:
-        print(f"[DB ERROR] Error decrementing like: {e}")
-        return False
-    finally:
-        cursor.close()
-        connection.close()
-
-
 def get_featured_posts():
     connection = get_connection()
     if connection is None:
@@ -232,10 +503,11 @@ def get_featured_posts():
     cursor = connection.cursor(dictionary=True)
     try:
         query = """
-            SELECT f.id, f.user_id, f.caption, f.image_path, f.like_user_ids, u.name as user_name, u.profile_picture
+            SELECT f.id, f.user_id, f.caption, f.image_path, u.name as user_name, u.profile_picture,
+                f.like_count AS likes
             FROM feed f
             JOIN user u ON f.user_id = u.id
-            ORDER BY f.like_user_ids DESC, f.id DESC
+            ORDER BY f.like_count DESC, f.id DESC
             LIMIT 5
         """
         cursor.execute(query)
@@ -248,27 +520,37 @@ def get_featured_posts():
         connection.close()
 
 
-def get_post_by_id(post_id):
+def get_post_by_id(
+    post_id, viewer_id=None, with_comments=False, comments_per_post=None
+):
     connection = get_connection()
     if connection is None:
         print(DB_CONN_ERROR)
         return None
     cursor = connection.cursor(dictionary=True)
     try:
-        query = """
-            SELECT f.id, f.user_id, f.caption, f.image_path, f.like_user_ids, u.name as user_name
+        query = f"""
+            SELECT f.id, f.user_id, f.caption, f.image_path, u.name as user_name, u.profile_picture,
+                {POST_LIKE_COLUMNS}
             FROM feed f
             JOIN user u ON f.user_id = u.id
             WHERE f.id = %s
         """
-        cursor.execute(query, (post_id,))
+        cursor.execute(query, (viewer_id, post_id))
         post = cursor.fetchone()
+        if post and with_comments:
+            comments_by_post, comment_counts = get_comments_for_posts(
+                connection, [post["id"]], comments_per_post
+            )
+            post["comments"] = comments_by_post.get(post["id"], [])
+            post["comment_count"] = comment_counts.get(post["id"], 0)
         if post:
             post["feed_id"] = post["id"]
             post["user"] = post["user_name"]
             post["content"] = post["caption"]
             post["image_url"] = post["image_path"]
-            post["likes"] = get_like_count(post["id"])
+            post["liked"] = bool(post["liked"])
+            post["profile_picture"] = post.get("profile_picture", "")
         return post
     except Exception as e:
         print(f"[DB ERROR] Error fetching post by id: {e}")
@@ -288,6 +570,7 @@ def update_post(post_id, content, image_filename):
         query = "UPDATE feed SET caption=%s, image_path=%s WHERE id=%s"
         cursor.execute(query, (content, image_filename, post_id))
         connection.commit()
+        bump_content_version("feed")
         return cursor.rowcount > 0
     except Exception as e:
         print(f"[DB ERROR] Error updating post: {e}")
@@ -307,6 +590,7 @@ def delete_post(post_id):
         query = "DELETE FROM feed WHERE id=%s"
         cursor.execute(query, (post_id,))
         connection.commit()
+        bump_content_version("feed")
         return cursor.rowcount > 0
     except Exception as e:
         print(f"[DB ERROR] Error deleting post: {e}")
@@ -321,24 +605,31 @@ def add_like(post_id, user_id):
     if connection is None:
         print(DB_CONN_ERROR)
         return False
-    cursor = connection.cursor(dictionary=True)
+    cursor = connection.cursor()
     try:
-        cursor.execute(SELECT_LIKE_USER_IDS_QUERY, (post_id,))
-        row = cursor.fetchone()
-        if row is None:
-            return False
-        user_ids = set((row["like_user_ids"] or "").split(","))
-        if str(user_id) not in user_ids:
-            user_ids.add(str(user_id))
-            new_ids = ",".join(user_ids)
-            cursor.execute(
-                "UPDATE feed SET like_user_ids = %s WHERE id = %s", (new_ids, post_id)
+        # Lock the feed row first (both toggles take locks in the order
+        # feed -> post_like) and only count the like if it is new.
+        cursor.execute(
+            """
+            UPDATE feed SET like_count = like_count + 1
+            WHERE id = %s AND NOT EXISTS (
+                SELECT 1 FROM post_like WHERE feed_id = %s AND user_id = %s
             )
-            connection.commit()
-            return True
-        return False
+            """,
+            (post_id, post_id, user_id),
+        )
+        if cursor.rowcount == 0:
+            return False
+        cursor.execute(
+            "INSERT INTO post_like (feed_id, user_id) VALUES (%s, %s)",
+            (post_id, user_id),
+        )
+        connection.commit()
+        bump_content_version("feed")
+        return True
     except Exception as e:
         print(f"[DB ERROR] Error adding like: {e}")
+        connection.rollback()
         return False
     finally:
         cursor.close()
@@ -350,24 +641,29 @@ def remove_like(post_id, user_id):
     if connection is None:
         print(DB_CONN_ERROR)
         return False
-    cursor = connection.cursor(dictionary=True)
+    cursor = connection.cursor()
     try:
-        cursor.execute(SELECT_LIKE_USER_IDS_QUERY, (post_id,))
-        row = cursor.fetchone()
-        if row is None or not row["like_user_ids"]:
-            return False
-        user_ids = set((row["like_user_ids"] or "").split(","))
-        if str(user_id) in user_ids:
-            user_ids.remove(str(user_id))
-            new_ids = ",".join(user_ids)
-            cursor.execute(
-                "UPDATE feed SET like_user_ids = %s WHERE id = %s", (new_ids, post_id)
+        cursor.execute(
+            """
+            UPDATE feed SET like_count = like_count - 1
+            WHERE id = %s AND like_count > 0 AND EXISTS (
+                SELECT 1 FROM post_like WHERE feed_id = %s AND user_id = %s
             )
-            connection.commit()
-            return True
-        return False
+            """,
+            (post_id, post_id, user_id),
+        )
+        if cursor.rowcount == 0:
+            return False
+        cursor.execute(
+            "DELETE FROM post_like WHERE feed_id = %s AND user_id = %s",
+            (post_id, user_id),
+        )
+        connection.commit()
+        bump_content_version("feed")
+        return True
     except Exception as e:
         print(f"[DB ERROR] Error removing like: {e}")
+        connection.rollback()
         return False
     finally:
         cursor.close()
@@ -379,19 +675,133 @@ def get_like_count(post_id):
     if connection is None:
         print(DB_CONN_ERROR)
         return 0
-    cursor = connection.cursor(dictionary=True)
+    cursor = connection.cursor()
     try:
-        cursor.execute(SELECT_LIKE_USER_IDS_QUERY, (post_id,))
+        cursor.execute("SELECT like_count FROM feed WHERE id = %s", (post_id,))
         row = cursor.fetchone()
-        if row and row["like_user_ids"] is not None:
-            # Only count non-empty user IDs
-            return len(
-                [uid for uid in (row["like_user_ids"] or "").split(",") if uid.strip()]
-            )
-        return 0
+        return row[0] if row else 0
     except Exception as e:
         print(f"[DB ERROR] Error getting like count: {e}")
         return 0
     finally:
         cursor.close()
         connection.close()
+
+
+def get_like_states(post_ids, user_id, fresh=False):
+    """Like counts of several posts and whether user_id likes each of them.
+
+    Args:
+        fresh (bool): Read on a connection of its own, which sees every
+            committed write, instead of the request's REPEATABLE READ
+            snapshot
+
+    Returns:
+        dict: post id -> (like_count, liked) for the posts that exist
+    """
+    if not post_ids:
+        return {}
+    connection = get_standalone_connection() if fresh else get_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return {}
+    cursor = connection.cursor()
+    try:
+        format_strings = ",".join(["%s"] * len(post_ids))
+        cursor.execute(
+            f"""
+            SELECT f.id, f.like_count, EXISTS(
+                SELECT 1 FROM post_like pl WHERE pl.feed_id = f.id AND pl.user_id = %s
+            )
+            FROM feed f
+            WHERE f.id IN ({format_strings})
+            """,
+            (user_id, *post_ids),
+        )
+        return {row[0]: (row[1], bool(row[2])) for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"[DB ERROR] Error getting like states: {e}")
+        return {}
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def apply_like_changes(changes):
+    """Apply a batch of likes and unlikes in one transaction.
+
+    Args:
+        changes (list): (post_id, user_id, liked) tuples, at most one per
+            post and user
+
+    Returns:
+        dict: post id -> net change applied to its like_count, or None if
+        the batch failed and was rolled back
+    """
+    by_post = {}
+    for post_id, user_id, liked in changes:
+        adds, removes = by_post.setdefault(post_id, ([], []))
+        (adds if liked else removes).append(user_id)
+    if not by_post:
+        return {}
+
+    connection = get_connection()
+    if connection is None:
+        print(DB_CONN_ERROR)
+        return None
+    cursor = connection.cursor()
+    try:
+        # Lock the feed rows first, in id order, so batches and single
+        # toggles always take locks in the order feed -> post_like.
+        post_ids = sorted(by_post)
+        format_strings = ",".join(["%s"] * len(post_ids))
+        cursor.execute(
+            f"SELECT id FROM feed WHERE id IN ({format_strings}) ORDER BY id FOR UPDATE",
+            tuple(post_ids),
+        )
+        existing = [row[0] for row in cursor.fetchall()]
+
+        deltas = {}
+        for post_id in existing:
+            adds, removes = by_post[post_id]
+            delta = 0
+            if adds:
+                values = ",".join(["(%s, %s)"] * len(adds))
+                params = [value for user_id in adds for value in (post_id, user_id)]
+                cursor.execute(
+                    f"INSERT IGNORE INTO post_like (feed_id, user_id) VALUES {values}",
+                    tuple(params),
+                )
+                delta += cursor.rowcount
+            if removes:
+                user_strings = ",".join(["%s"] * len(removes))
+                cursor.execute(
+                    f"DELETE FROM post_like WHERE feed_id = %s AND user_id IN ({user_strings})",
+                    (post_id, *removes),
+                )
+                delta -= cursor.rowcount
+            if delta:
+                deltas[post_id] = delta
+
+        if deltas:
+            cases = " ".join(["WHEN %s THEN %s"] * len(deltas))
+            params = [value for item in deltas.items() for value in item]
+            format_strings = ",".join(["%s"] * len(deltas))
+            cursor.execute(
+                f"""
+                UPDATE feed
+                SET like_count = GREATEST(like_count + CASE id {cases} ELSE 0 END, 0)
+                WHERE id IN ({format_strings})
+                """,
+                tuple(params) + tuple(deltas),
+            )
+        connection.commit()
+        bump_content_version("feed")
+        return deltas
+    except Exception as e:
+        print(f"[DB ERROR] Error applying like batch: {e}")
+        connection.rollback()
+        return None
+    finally:
+        cursor.close()
+        connection.close()
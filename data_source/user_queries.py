@@ -2,6 +2,7 @@ from datetime import datetime, timedelta, timezone
 
 from flask import current_app
 
+from data_source.content_version_queries import bump_content_version
 from data_source.db_connection import get_connection
 
 
@@ -113,6 +114,7 @@ def disable_otp_by_user_id(user_id):
             "UPDATE user SET otp_enabled=0, otp_secret=NULL WHERE id=%s", (user_id,)
         )
         connection.commit()
+        bump_content_version("user")
         cursor.close()
         connection.close()
         return True
@@ -162,6 +164,7 @@ def enable_2fa(user_id):
         cursor = connection.cursor(buffered=True)
         cursor.execute("UPDATE user SET otp_enabled=1 WHERE id=%s", (user_id,))
         connection.commit()
+        bump_content_version("user")
         cursor.close()
         connection.close()
         return True
@@ -310,6 +313,7 @@ def update_user_profile_by_id(
             query = "UPDATE user SET name = %s, password = %s WHERE id = %s"
             cursor.execute(query, (name, password, user_id))
         connection.commit()
+        bump_content_version("user")
         return cursor.rowcount > 0
     except Exception as e:
         print("Update failed:", e)
@@ -354,6 +358,7 @@ def remove_user_profile_picture(user_id: int) -> bool:
         query = "UPDATE user SET profile_picture = '' WHERE id = %s"
         cursor.execute(query, (user_id,))
         connection.commit()
+        bump_content_version("user")
         return cursor.rowcount > 0
     except Exception as e:
         print("Remove profile picture failed:", e)
@@ -0,0 +1,84 @@
+import sys
+
+import mysql.connector
+from migration_utils import column_exists, connect
+
+BATCH_SIZE = 1000
+
+CREATE_ACTIVITY_PARTICIPANT_TABLE = """
+    CREATE TABLE IF NOT EXISTS `activity_participant` (
+      `activity_id` INT NOT NULL,
+      `user_id` INT NOT NULL,
+      `joined_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (`activity_id`, `user_id`),
+      INDEX `idx_activity_participant_user_id` (`user_id`, `activity_id`),
+      CONSTRAINT `fk_activity_participant_activity`
+        FOREIGN KEY (`activity_id`) REFERENCES `sports_activity` (`id`)
+        ON DELETE CASCADE ON UPDATE NO ACTION,
+      CONSTRAINT `fk_activity_participant_user`
+        FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
+        ON DELETE CASCADE ON UPDATE NO ACTION
+    ) ENGINE = InnoDB
+"""
+
+
+def parse_user_id_list_join(user_id_list_join):
+    # The CSV may contain empty entries and stray whitespace
+    return {
+        int(uid)
+        for uid in (user_id_list_join or "").split(",")
+        if uid.strip().isdigit()
+    }
+
+
+def migrate(drop_column=False):
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_ACTIVITY_PARTICIPANT_TABLE)
+
+        if not column_exists(cursor, "sports_activity", "user_id_list_join"):
+            print(
+                "sports_activity.user_id_list_join does not exist; nothing to backfill."
+            )
+            return
+
+        cursor.execute(
+            "SELECT id, user_id_list_join FROM sports_activity "
+            "WHERE user_id_list_join IS NOT NULL AND user_id_list_join != ''"
+        )
+        rows = cursor.fetchall()
+
+        pairs = [
+            (activity_id, user_id)
+            for activity_id, user_id_list_join in rows
+            for user_id in sorted(parse_user_id_list_join(user_id_list_join))
+        ]
+        inserted = 0
+        # INSERT IGNORE skips participants that already exist and deleted users
+        for start in range(0, len(pairs), BATCH_SIZE):
+            cursor.executemany(
+                "INSERT IGNORE INTO activity_participant (activity_id, user_id) "
+                "VALUES (%s, %s)",
+                pairs[start : start + BATCH_SIZE],
+            )
+            inserted += cursor.rowcount
+        conn.commit()
+        print(
+            f"Backfilled {inserted} of {len(pairs)} participants from {len(rows)} "
+            "activities into activity_participant."
+        )
+
+        if drop_column:
+            cursor.execute("ALTER TABLE sports_activity DROP COLUMN user_id_list_join")
+            print("Dropped sports_activity.user_id_list_join.")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print("Error:", err)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate(drop_column="--drop-column" in sys.argv[1:])
@@ -0,0 +1,42 @@
+import mysql.connector
+from migration_utils import connect, index_exists
+
+# Index name -> CREATE INDEX statement. Entries of a secondary index end
+# with the primary key, so idx_sports_activity_date is ordered by (date, id)
+# for the paged listing, the type filter scans idx_sports_activity_type_date
+# and the search form matches against ft_sports_activity_search.
+INDEXES = {
+    "idx_sports_activity_date": (
+        "CREATE INDEX idx_sports_activity_date ON sports_activity (date)"
+    ),
+    "idx_sports_activity_type_date": (
+        "CREATE INDEX idx_sports_activity_type_date "
+        "ON sports_activity (activity_type, date)"
+    ),
+    "ft_sports_activity_search": (
+        "CREATE FULLTEXT INDEX ft_sports_activity_search "
+        "ON sports_activity (activity_name, skills_req, location)"
+    ),
+}
+
+
+def migrate():
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        for index, statement in INDEXES.items():
+            if index_exists(cursor, "sports_activity", index):
+                print(f"Index {index} already exists.")
+                continue
+            cursor.execute(statement)
+            print(f"Added index {index}.")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print("Error:", err)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,33 @@
+import mysql.connector
+from migration_utils import connect
+
+CREATE_CONTENT_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS `content_version` (
+      `name` VARCHAR(32) NOT NULL,
+      `version` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+      PRIMARY KEY (`name`)
+    ) ENGINE = InnoDB
+"""
+
+
+def migrate():
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_CONTENT_VERSION_TABLE)
+        cursor.execute(
+            "INSERT IGNORE INTO content_version (name) "
+            "VALUES ('feed'), ('bulletin'), ('user')"
+        )
+        conn.commit()
+        print("Created content_version.")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print("Error:", err)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
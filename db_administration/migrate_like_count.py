@@ -0,0 +1,38 @@
+import mysql.connector
+from migration_utils import column_exists, connect, index_exists
+
+
+def migrate():
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "feed", "like_count"):
+            cursor.execute(
+                "ALTER TABLE feed ADD COLUMN like_count INT NOT NULL DEFAULT 0"
+            )
+            print("Added feed.like_count.")
+        if not index_exists(cursor, "feed", "idx_feed_like_count"):
+            cursor.execute(
+                "CREATE INDEX idx_feed_like_count ON feed (like_count DESC, id DESC)"
+            )
+            print("Added index idx_feed_like_count.")
+
+        # Recount from post_like; also repairs counters that drifted
+        cursor.execute("""
+            UPDATE feed f
+            SET f.like_count = (
+                SELECT COUNT(*) FROM post_like pl WHERE pl.feed_id = f.id
+            )
+            """)
+        conn.commit()
+        print(f"Recounted likes for {cursor.rowcount} posts.")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print("Error:", err)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
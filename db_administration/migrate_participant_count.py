@@ -0,0 +1,34 @@
+import mysql.connector
+from migration_utils import column_exists, connect
+
+
+def migrate():
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "sports_activity", "participant_count"):
+            cursor.execute(
+                "ALTER TABLE sports_activity "
+                "ADD COLUMN participant_count INT NOT NULL DEFAULT 0"
+            )
+            print("Added sports_activity.participant_count.")
+
+        # Recount from activity_participant; also repairs counters that drifted
+        cursor.execute("""
+            UPDATE sports_activity sa
+            SET sa.participant_count = (
+                SELECT COUNT(*) FROM activity_participant ap WHERE ap.activity_id = sa.id
+            )
+            """)
+        conn.commit()
+        print(f"Recounted participants for {cursor.rowcount} activities.")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print("Error:", err)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,78 @@
+import sys
+
+import mysql.connector
+from migration_utils import column_exists, connect
+
+BATCH_SIZE = 1000
+
+CREATE_POST_LIKE_TABLE = """
+    CREATE TABLE IF NOT EXISTS `post_like` (
+      `feed_id` INT NOT NULL,
+      `user_id` INT NOT NULL,
+      `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      PRIMARY KEY (`feed_id`, `user_id`),
+      INDEX `idx_post_like_user_id` (`user_id`, `feed_id`),
+      CONSTRAINT `fk_post_like_feed`
+        FOREIGN KEY (`feed_id`) REFERENCES `feed` (`id`)
+        ON DELETE CASCADE ON UPDATE NO ACTION,
+      CONSTRAINT `fk_post_like_user`
+        FOREIGN KEY (`user_id`) REFERENCES `user` (`id`)
+        ON DELETE CASCADE ON UPDATE NO ACTION
+    ) ENGINE = InnoDB
+"""
+
+
+def parse_like_user_ids(like_user_ids):
+    # The CSV may contain empty entries and stray whitespace
+    return {
+        int(uid) for uid in (like_user_ids or "").split(",") if uid.strip().isdigit()
+    }
+
+
+def migrate(drop_column=False):
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_POST_LIKE_TABLE)
+
+        if not column_exists(cursor, "feed", "like_user_ids"):
+            print("feed.like_user_ids does not exist; nothing to backfill.")
+            return
+
+        cursor.execute(
+            "SELECT id, like_user_ids FROM feed "
+            "WHERE like_user_ids IS NOT NULL AND like_user_ids != ''"
+        )
+        rows = cursor.fetchall()
+
+        pairs = [
+            (feed_id, user_id)
+            for feed_id, like_user_ids in rows
+            for user_id in sorted(parse_like_user_ids(like_user_ids))
+        ]
+        inserted = 0
+        # INSERT IGNORE skips likes that already exist and likes by deleted users
+        for start in range(0, len(pairs), BATCH_SIZE):
+            cursor.executemany(
+                "INSERT IGNORE INTO post_like (feed_id, user_id) VALUES (%s, %s)",
+                pairs[start : start + BATCH_SIZE],
+            )
+            inserted += cursor.rowcount
+        conn.commit()
+        print(
+            f"Backfilled {inserted} of {len(pairs)} likes from {len(rows)} posts into post_like."
+        )
+
+        if drop_column:
+            cursor.execute("ALTER TABLE feed DROP COLUMN like_user_ids")
+            print("Dropped feed.like_user_ids.")
+    except mysql.connector.Error as err:
+        conn.rollback()
+        print("Error:", err)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate(drop_column="--drop-column" in sys.argv[1:])
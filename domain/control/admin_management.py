@@ -8,6 +8,7 @@ from data_source.admin_queries import (
     get_social_post_by_id,
 )
 from data_source.bulletin_queries import get_sports_activity_by_id
+from domain.control.social_feed_management import invalidate_featured_posts
 
 
 # Deletes an activity from the bulletin board by its ID.
@@ -39,7 +40,7 @@ def remove_social_post(post_id: int):
         if not post:
             return False
 
-        post_id, _, image_path, _, _ = post
+        post_id, image_path = post
         # If the post has an image, remove it from the filesystem
         if image_path:
             rel_path = image_path.lstrip("/")  # Remove leading slash if present
@@ -50,7 +51,10 @@ def remove_social_post(post_id: int):
                 os.remove(image_path)
 
         # Delete the post
-        return delete_social_post(post_id)
+        success = delete_social_post(post_id)
+        if success:
+            invalidate_featured_posts(post_id)
+        return success
 
     except OSError as e:
         print(f"File system error while deleting post: {e}")
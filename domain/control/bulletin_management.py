@@ -1,28 +1,31 @@
+import re
+from datetime import datetime
+
 from flask import g
 from flask_login import current_user
 
 from data_source.bulletin_queries import (
+    ACTIVITY_FULL,
+    ALREADY_JOINED,
+    JOINED,
     get_all_bulletin,
     get_bulletin_by_types,
-    get_bulletin_via_name,
     get_host_id,
-    get_sports_activity_by_id,
     insert_new_activity,
-    update_sports_activity,
+    join_activity,
+    search_activities,
 )
+from data_source.db_connection import transaction
 from domain.entity.sports_activity import SportsActivity
 
+BULLETIN_PAGE_SIZE = 24
+SEARCH_RESULT_LIMIT = 50
+
 
 def create_entity_from_row(result):
     bulletin_list = []
 
     for row in result:
-        user_id_list = row.get("user_id_list_join")
-        current_count = len(user_id_list.split(",")) if user_id_list else 0
-
-        if current_count >= row["max_pax"]:
-            continue  # Skip adding this activity if full
-
         activity = SportsActivity(
             id=row["id"],
             user_id=row["user_id"],
@@ -32,7 +35,7 @@ def create_entity_from_row(result):
             date=row["date"],  # optionally parse as datetime
             location=row["location"],
             max_pax=row["max_pax"],
-            user_id_list_join=user_id_list,
+            participant_count=row["participant_count"],
         )
         bulletin_list.append(activity)
 
@@ -40,12 +43,47 @@ def create_entity_from_row(result):
     return bulletin_list
 
 
-def get_bulletin_listing():
-    result = get_all_bulletin()
-    if not result:
-        return []
-    bulletin_list = create_entity_from_row(result)
-    return bulletin_list
+def encode_bulletin_cursor(activity):
+    """Cursor for the page after activity: its date and id"""
+    return f"{activity.get_date().isoformat()}_{activity.get_id()}"
+
+
+def decode_bulletin_cursor(cursor):
+    """(date, id) from encode_bulletin_cursor(), or None if cursor is invalid"""
+    date, _, activity_id = (cursor or "").rpartition("_")
+    try:
+        return datetime.fromisoformat(date), int(activity_id)
+    except ValueError:
+        return None
+
+
+def get_bulletin_listing(cursor=None, limit=BULLETIN_PAGE_SIZE):
+    """Get one page of upcoming activities with free spots, soonest first
+
+    Args:
+        cursor (str): Cursor from the previous page; only later activities
+            are returned. An invalid cursor starts from the first page.
+        limit (int): Page size
+
+    Returns:
+        tuple: (list of SportsActivity entities, cursor for the next page or None)
+    """
+    # Fetch one extra row to find out whether another page exists
+    result = get_all_bulletin(after=decode_bulletin_cursor(cursor), limit=limit + 1)
+    has_more = len(result) > limit
+    bulletin_list = create_entity_from_row(result[:limit])
+    next_cursor = encode_bulletin_cursor(bulletin_list[-1]) if has_more else None
+    return bulletin_list, next_cursor
+
+
+def get_bulletin_listing_display_data(cursor=None):
+    """Load one page of upcoming activities and return its display data
+
+    Returns:
+        tuple: (list of display dicts, cursor for the next page or None)
+    """
+    _, next_cursor = get_bulletin_listing(cursor)
+    return get_bulletin_display_data(), next_cursor
 
 
 def get_host_name(activity_id):
@@ -69,21 +107,8 @@ def get_bulletin_display_data():
                 "date": activity.get_date(),
                 "location": activity.get_location(),
                 "max_pax": activity.get_max_pax(),
-                "count": int(activity.get_max_pax())
-                - len(
-                    [
-                        uid
-                        for uid in (activity.get_user_id_list_join() or "").split(",")
-                        if uid.strip()
-                    ]
-                ),
+                "count": int(activity.get_max_pax()) - activity.get_participant_count(),
                 "host_by_current_user": activity.get_user_id() == current_user.id,
-                # "who_joined": [
-                #     get_username_by_id(uid.strip()).get("name")
-                #     for uid in (activity.get_user_id_list_join() or "").split(",")
-                #     if uid.strip()
-                # ] if activity.get_user_id() == current_user.id else None,
-                #
             }
         )
 
@@ -91,42 +116,34 @@ def get_bulletin_display_data():
 
 
 def search_bulletin(query):
-    result = get_bulletin_via_name(query)
+    # Words only; punctuation would be read as full-text search operators
+    terms = re.findall(r"\w+", query or "")
+    if not terms:
+        # Nothing to search for: show the first page of all activities
+        bulletin_list, _ = get_bulletin_listing()
+        return bulletin_list
+    result = search_activities(terms, SEARCH_RESULT_LIMIT)
     if not result:
         return []
     bulletin_list = create_entity_from_row(result)
     return bulletin_list
 
 
+JOIN_MESSAGES = {
+    JOINED: "Successfully joined the activity! You may view it in your profile",
+    ALREADY_JOINED: "You have already joined this activity.",
+    ACTIVITY_FULL: "This activity is already full.",
+}
+
+
 def join_activity_control(activity_id, user_id):
-    activity_data = get_sports_activity_by_id(activity_id)
-    if not activity_data:
-        return None
-    sports_activity = SportsActivity(
-        id=activity_data["id"],
-        user_id=activity_data["user_id"],
-        activity_name=activity_data["activity_name"],
-        activity_type=activity_data["activity_type"],
-        skills_req=activity_data["skills_req"],
-        date=activity_data["date"],  # optionally parse as datetime
-        location=activity_data["location"],
-        max_pax=activity_data["max_pax"],
-        user_id_list_join=activity_data.get("user_id_list_join"),
-    )
-    # Check if user is already in the joined list
-    joined_users = sports_activity.get_user_id_list_join()
-    if joined_users:
-        joined_list = [uid.strip() for uid in joined_users.split(",") if uid.strip()]
-        if str(user_id) in joined_list:
-            return False  # Already joined
-
-    sports_activity.set_user_id_list_join(user_id)
-    result = update_sports_activity(
-        sports_activity.get_id(), sports_activity.get_user_id_list_join()
-    )
-    if result:
-        return True
-    return False
+    # Capacity and duplicate joins are checked under the activity's row
+    # lock, which is released when the transaction commits
+    with transaction():
+        outcome = join_activity(activity_id, user_id)
+    if outcome is None:
+        return False, "Activity not found."
+    return outcome == JOINED, JOIN_MESSAGES[outcome]
 
 
 def create_activity(
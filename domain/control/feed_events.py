@@ -0,0 +1,109 @@
+import os
+import queue
+import threading
+
+# Longest a subscriber may fall behind before its events are dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Open /feed/events streams per worker process. Each one holds a worker
+# thread while its client is connected, so by default every gunicorn thread
+# but REQUEST_THREADS may serve a stream (see the Dockerfile); further
+# clients are turned away and poll /feed/changes instead.
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "64"))
+REQUEST_THREADS = int(os.getenv("REQUEST_THREADS", "16"))
+MAX_EVENT_STREAMS = int(
+    os.getenv("MAX_EVENT_STREAMS", max(1, GUNICORN_THREADS - REQUEST_THREADS))
+)
+
+
+class Subscription:
+    """Queue of feed events for one connected client.
+
+    Args:
+        post_ids (set): Only deliver like/comment events for these posts
+            (None = every post). New-post events are always delivered.
+    """
+
+    def __init__(self, bus, post_ids=None):
+        self._bus = bus
+        self.post_ids = post_ids
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when events were dropped; the client must re-read its state
+        self.overflowed = False
+
+    def wants(self, event):
+        if event["type"] == "post" or self.post_ids is None:
+            return True
+        return event.get("post_id") in self.post_ids
+
+    def get(self, timeout):
+        """Next event, or None if nothing arrived within timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """In-process publish/subscribe for live feed updates.
+
+    Publishing never blocks: a subscriber whose queue is full misses the
+    event and is flagged as overflowed instead of slowing the writer down.
+    Only clients connected to the same worker process see an event.
+
+    Args:
+        max_subscribers (int): Subscriptions open at once; None = no limit.
+    """
+
+    def __init__(self, max_subscribers=None):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._stats = {"published": 0, "delivered": 0, "dropped": 0, "rejected": 0}
+
+    def subscribe(self, post_ids=None):
+        """New subscription, or None if max_subscribers are already open."""
+        subscription = Subscription(self, post_ids)
+        with self._lock:
+            if (
+                self.max_subscribers is not None
+                and len(self._subscribers) >= self.max_subscribers
+            ):
+                self._stats["rejected"] += 1
+                return None
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._stats["published"] += 1
+        delivered = dropped = 0
+        for subscription in subscribers:
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                delivered += 1
+            except queue.Full:
+                subscription.overflowed = True
+                dropped += 1
+        with self._lock:
+            self._stats["delivered"] += delivered
+            self._stats["dropped"] += dropped
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["subscribers"] = len(self._subscribers)
+        return stats
+
+
+feed_events = EventBus(max_subscribers=MAX_EVENT_STREAMS)
@@ -0,0 +1,24 @@
+import hashlib
+
+from data_source.content_version_queries import get_content_versions
+
+
+def get_page_etag(sources, *viewer_state):
+    """Fingerprint of a page, cheap enough to check before rendering it.
+
+    Args:
+        sources (tuple): Kinds of content the page shows ("feed",
+            "bulletin", "user"); any write to them changes the ETag.
+        viewer_state: Anything else the page depends on for this viewer,
+            e.g. the user ID and the request path.
+
+    Returns:
+        str: ETag value, or None if the versions could not be read (the
+        page should then be rendered without one).
+    """
+    result = get_content_versions(sources)
+    if result is None:
+        return None
+    versions, today = result
+    fingerprint = (sorted(versions.items()), today.isoformat(), viewer_state)
+    return hashlib.blake2b(repr(fingerprint).encode(), digest_size=12).hexdigest()
@@ -11,10 +11,10 @@ from data_source.bulletin_queries import (
     get_joined_activities,
     get_joined_user_names_by_activity_id,
     get_sports_activity_by_id,
-    update_sports_activity,
+    remove_participant,
     update_sports_activity_details,
 )
-from data_source.social_feed_queries import get_posts_by_user_id
+from data_source.db_connection import transaction
 from data_source.user_queries import (
     disable_otp_by_user_id,
     get_user_by_id,
@@ -22,8 +22,11 @@ from data_source.user_queries import (
     update_user_profile_by_id,
 )
 from domain.control.otp_management import generate_otp_for_user, verify_and_enable_otp
-from domain.control.social_feed_management import delete_post, edit_post
-from domain.entity.social_post import Comment, Post
+from domain.control.social_feed_management import (
+    delete_post,
+    edit_post,
+    iter_posts_control,
+)
 from domain.entity.sports_activity import SportsActivity
 from domain.entity.user import User
 
@@ -86,39 +89,13 @@ class ProfileManagement:
         g.current_user_profile = user
         return user
 
-    def get_user_posts(self, user_id):
-        posts = get_posts_by_user_id(user_id)
-        post_objs = []
-        for post in posts:
-            comments = [
-                Comment(
-                    id=int(c.get("id", 0) or 0),
-                    post_id=int(post.get("id", 0) or 0),
-                    user=str(c.get("user", "")),
-                    content=str(c.get("content", "")),
-                    profile_picture=str(c.get("profile_picture", "")),
-                )
-                for c in post.get("comments", [])
-            ]
-            # Handle likes being None or empty string
-            likes_val = post.get("likes", 0)
-            if likes_val in (None, ""):
-                likes_val = 0
-            else:
-                likes_val = int(likes_val)
-            post_obj = Post(
-                id=int(post.get("id", 0) or 0),
-                user=str(post.get("user", "")),
-                content=str(post.get("content", "")),
-                image_url=str(post.get("image_url", "")),
-                likes=likes_val,
-                comments=comments,
-                like_user_ids=str(post.get("like_user_ids", "")),
-            )
-            post_objs.append(post_obj)
-        # Store user posts in Flask g object
-        g.user_posts = post_objs
-        return post_objs
+    def iter_user_posts(self, user_id):
+        """Yield the user's own posts newest first, a batch at a time.
+
+        Nothing is collected into a list or g, so a user with many posts
+        does not hold them all in memory at once.
+        """
+        return iter_posts_control(viewer_id=user_id, user_id=user_id)
 
     def create_entity_from_row(self, hosted_activities_raw, joined_activities_raw):
         hosted_activities = [
@@ -169,23 +146,25 @@ class ProfileManagement:
         if hashed_password is False:
             return False
 
-        if hashed_password:
-            result = self.update_profile(
-                user_id, name, hashed_password, profile_picture_url
-            )
-        else:
-            user_data = get_user_by_id(user_id)
-            current_password = (
-                user_data["password"]
-                if isinstance(user_data, dict) and "password" in user_data
-                else ""
-            )
-            if profile_picture_url is not None:
+        # Read the current password and write the update as one unit
+        with transaction():
+            if hashed_password:
                 result = self.update_profile(
-                    user_id, name, current_password, profile_picture_url
+                    user_id, name, hashed_password, profile_picture_url
                 )
             else:
-                result = self.update_profile(user_id, name, current_password)
+                user_data = get_user_by_id(user_id)
+                current_password = (
+                    user_data["password"]
+                    if isinstance(user_data, dict) and "password" in user_data
+                    else ""
+                )
+                if profile_picture_url is not None:
+                    result = self.update_profile(
+                        user_id, name, current_password, profile_picture_url
+                    )
+                else:
+                    result = self.update_profile(user_id, name, current_password)
 
         if result:
             g.updated_profile = {
@@ -243,7 +222,6 @@ class ProfileManagement:
                 date=str(activity_data.get("date", "")),
                 location=str(activity_data.get("location", "")),
                 max_pax=int(activity_data.get("max_pax", 0)),
-                user_id_list_join=str(activity_data.get("user_id_list_join", "")),
             )
         else:
             activity = SportsActivity(
@@ -255,7 +233,6 @@ class ProfileManagement:
                 date=str(getattr(activity_data, "date", "")),
                 location=str(getattr(activity_data, "location", "")),
                 max_pax=int(getattr(activity_data, "max_pax", 0)),
-                user_id_list_join=str(getattr(activity_data, "user_id_list_join", "")),
             )
 
         if activity.get_user_id() != user_id:
@@ -280,7 +257,6 @@ class ProfileManagement:
             activity.date,
             activity.location,
             activity.max_pax,
-            activity.user_id_list_join,
         )
         if result:
             g.updated_activity = activity
@@ -302,30 +278,13 @@ class ProfileManagement:
         activity = get_sports_activity_by_id(activity_id)
         if not activity:
             return False, "Activity not found."
-        if hasattr(activity, "get") and callable(activity.get):
-            user_id_list_join = activity.get("user_id_list_join", "") or ""
-        else:
-            user_id_list_join = getattr(activity, "user_id_list_join", "") or ""
-        if not isinstance(user_id_list_join, str):
-            user_id_list_join = str(user_id_list_join)
-        joined_ids = [
-            uid.strip()
-            for uid in user_id_list_join.split(",")
-            if isinstance(uid, str) and uid.strip()
-        ]
-        if str(user_id) not in joined_ids:
+        # Frees the spot and removes the participant as one unit
+        with transaction():
+            left = remove_participant(activity_id, user_id)
+        if not left:
             return False, "You are not a participant in this activity."
-        joined_ids.remove(str(user_id))
-        new_join_list = ",".join(joined_ids)
-        result = update_sports_activity(activity_id, new_join_list)
-        if result:
-            g.left_activity = {
-                "user_id": user_id,
-                "activity_id": activity_id,
-                "new_join_list": new_join_list,
-            }
-            return True, "Successfully left the activity."
-        return False, "Failed to leave the activity."
+        g.left_activity = {"user_id": user_id, "activity_id": activity_id}
+        return True, "Successfully left the activity."
 
     def delete_post(self, user_id, post_id):
         success = delete_post(user_id, post_id)
@@ -377,31 +336,6 @@ class ProfileManagement:
             "otp_enabled": user.get_otp_enabled(),
         }
 
-    def get_user_posts_display_data(self):
-        """
-        Retrieve display data for the current user's posts
-
-        Returns:
-            list: List of user posts display information, or empty list if no posts
-        """
-        posts = g.get("user_posts", [])
-        if not posts:
-            return []
-
-        return [
-            {
-                "id": post.get_id(),
-                "user": post.get_user(),
-                "content": post.get_content(),
-                "image_url": post.get_image_url(),
-                "created_at": post.get_created_at(),
-                "likes": post.get_likes(),
-                "comments_count": len(post.get_comments()),
-                "like_user_ids": post.get_like_user_ids(),
-            }
-            for post in posts
-        ]
-
     def get_user_activities_display_data(self):
         hosted_activities = g.get("user_hosted_activities", [])
         joined_only_activities = g.get("user_joined_activities", [])
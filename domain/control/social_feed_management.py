@@ -1,27 +1,52 @@
 import os
 import uuid
+from functools import partial
 
 from flask import current_app, g
 from PIL import Image, UnidentifiedImageError
 from werkzeug.utils import secure_filename
 
+from data_source.cache import get_cache
+from data_source.db_connection import call_after_commit
+from data_source.like_buffer import LikeBuffer
 from data_source.social_feed_queries import (
     add_comment,
     add_like,
     add_post,
+    apply_like_changes,
 )
 from data_source.social_feed_queries import delete_post as ds_delete_post
 from data_source.social_feed_queries import (
     get_all_posts,
+    get_comments_page,
+    get_comments_since,
     get_featured_posts,
+    get_feed_change_marker,
     get_like_count,
+    get_like_states,
     get_post_by_id,
     get_posts_by_user_id,
+    iter_posts,
     remove_like,
     update_post,
 )
+from domain.control.feed_events import feed_events
 from domain.entity.social_post import Comment, Post
 
+FEED_PAGE_SIZE = 10
+# Newest comments shown inline per feed post; older ones load on demand
+FEED_COMMENTS_PER_POST = 3
+COMMENT_PAGE_SIZE = 20
+# Posts read per query when a whole feed is streamed
+POST_STREAM_BATCH_SIZE = int(os.getenv("POST_STREAM_BATCH_SIZE", "50"))
+
+# The featured sidebar is the same for every viewer, so its rows are cached
+# briefly and dropped when a like, unlike or delete could reorder them.
+FEATURED_POSTS_KEY = "featured_posts"
+featured_posts_cache = get_cache(
+    "featured_posts", int(os.getenv("FEATURED_POSTS_CACHE_TTL", "30"))
+)
+
 
 def allowed_file(filename):
     # Check if the uploaded file has an allowed image extension
@@ -33,60 +58,248 @@ def allowed_file(filename):
     }
 
 
+# Convert comment dicts from the query layer to Comment entities
+def create_comments_from_rows(post_id, rows):
+    return [
+        Comment(
+            id=comment_data["id"],
+            post_id=post_id,
+            user=comment_data.get("user", ""),
+            content=comment_data.get("content", ""),
+            profile_picture=comment_data.get("profile_picture", ""),
+        )
+        for comment_data in rows
+    ]
+
+
+# Show likes still waiting in the like buffer on rows read for viewer_id,
+# so a page rendered right after a toggle matches what the viewer did
+def apply_pending_likes(row, viewer_id):
+    if like_buffer is not None and viewer_id is not None:
+        row["likes"], row["liked"] = like_buffer.pending_state(
+            row["id"], viewer_id, row.get("likes", 0), bool(row.get("liked", False))
+        )
+    return row
+
+
+# Convert one database row to a Post entity using actual DB field names
+def create_post_from_row(row):
+    # Convert comments to Comment entities
+    comments = create_comments_from_rows(row["id"], row.get("comments", []))
+
+    # Create Post entity using only DB field names
+    post = Post(
+        id=row["id"],
+        user=row.get("user_name", ""),
+        content=row.get("caption", ""),
+        image_url=row.get("image_path", ""),
+        likes=row.get("likes", 0),
+        comments=comments,
+        liked=bool(row.get("liked", False)),
+        comment_count=row.get("comment_count", len(comments)),
+        profile_picture=row.get("profile_picture", ""),
+    )
+    return post
+
+
 # Convert database rows to Post entities using actual DB field names
 def create_entity_from_row(result):
 
-    post_list = []
+    post_list = [create_post_from_row(row) for row in result]
 
-    for row in result:
-        # Convert comments to Comment entities
-        comments = []
-        for comment_data in row.get("comments", []):
-            comment = Comment(
-                id=comment_data["id"],
-                post_id=row["id"],
-                user=comment_data.get("user", ""),
-                content=comment_data.get("content", ""),
-                profile_picture=comment_data.get("profile_picture", ""),
-            )
-            comments.append(comment)
+    g.post_list = post_list
+    return post_list
 
-        # Create Post entity using only DB field names
-        post = Post(
-            id=row["id"],
-            user=row.get("user_name", ""),
-            content=row.get("caption", ""),
-            image_url=row.get("image_path", ""),
-            likes=get_like_count(row["id"]),
-            comments=comments,
-            like_user_ids=row.get("like_user_ids", ""),
+
+def iter_posts_control(
+    viewer_id=None,
+    user_id=None,
+    comments_per_post=None,
+    batch_size=POST_STREAM_BATCH_SIZE,
+):
+    """Yield Post entities for the whole feed, newest first
+
+    Rows are read batch_size at a time and turned into entities as they
+    are consumed, so memory stays bounded however many posts there are.
+    Nothing is kept in g; iterate the result only once.
+
+    Args:
+        viewer_id (int): User viewing the posts, used for the liked flag
+        user_id (int): Only yield posts by this user
+        comments_per_post (int): Newest comments to load per post (None = none)
+
+    Yields:
+        Post: One post at a time
+    """
+    for row in iter_posts(
+        viewer_id,
+        user_id=user_id,
+        comments_per_post=comments_per_post,
+        batch_size=batch_size,
+    ):
+        yield create_post_from_row(apply_pending_likes(row, viewer_id))
+
+
+def get_feed_page_control(
+    viewer_id=None, before_id=None, user_id=None, limit=FEED_PAGE_SIZE
+):
+    """Get one page of the social feed, newest first
+
+    Args:
+        viewer_id (int): User viewing the feed, used for the liked flag
+        before_id (int): Cursor from the previous page; only older posts are returned
+        user_id (int): Only return posts by this user
+        limit (int): Page size
+
+    Returns:
+        tuple: (list of Post entities, cursor for the next page or None)
+    """
+    # Fetch one extra row to find out whether another page exists
+    if user_id is None:
+        result = get_all_posts(
+            viewer_id,
+            before_id=before_id,
+            limit=limit + 1,
+            comments_per_post=FEED_COMMENTS_PER_POST,
+        )
+    else:
+        result = get_posts_by_user_id(
+            user_id,
+            viewer_id,
+            before_id=before_id,
+            limit=limit + 1,
+            with_comments=True,
+            comments_per_post=FEED_COMMENTS_PER_POST,
         )
-        # Attach profile_picture to the post object
-        post.profile_picture = row.get("profile_picture", "")
-        post_list.append(post)
+    has_more = len(result) > limit
+    post_list = create_entity_from_row(
+        [apply_pending_likes(row, viewer_id) for row in result[:limit]]
+    )
+    next_cursor = post_list[-1].get_id() if has_more else None
+    return post_list, next_cursor
 
-    g.post_list = post_list
-    return post_list
 
+def get_feed_changes_control(
+    viewer_id, post_ids, post_since, comment_since, like_token=None
+):
+    """Get what changed in the feed since a client's last poll
 
-def get_all_posts_control():
-    """Get all posts for display in the social feed
+    Args:
+        viewer_id (int): User polling, used for the liked flag
+        post_ids (list): Posts the client shows
+        post_since (int): Newest post ID the client has seen
+        comment_since (int): Newest comment ID the client has seen
+        like_token (str): like_token from the previous response, if any
 
     Returns:
-        list: List of Post entities
+        dict: None if nothing changed, otherwise new posts (the oldest
+        FEED_PAGE_SIZE after post_since, newest first) and whether more
+        remain for the next poll, new comments on
+        post_ids by post ID, like state of post_ids if any count changed, and
+        the post_since/comment_since/like_token for the next poll
     """
-    result = get_all_posts()
-    if not result:
-        return []
+    # One indexed query answers "anything new?" for the common empty poll
+    marker = get_feed_change_marker(post_ids)
+    if marker is None:
+        return None
+    max_post_id, max_comment_id, current_like_token = marker
+    new_posts = max_post_id > post_since
+    new_comments = max_comment_id > comment_since
+    likes_changed = current_like_token != like_token
+    if not (new_posts or new_comments or likes_changed):
+        return None
+
+    posts, more_posts = [], False
+    if new_posts:
+        # Oldest first, so a burst larger than one page is delivered over
+        # several polls instead of skipping the posts in between
+        rows = get_all_posts(
+            viewer_id,
+            after_id=post_since,
+            limit=FEED_PAGE_SIZE + 1,
+            comments_per_post=FEED_COMMENTS_PER_POST,
+            oldest_first=True,
+        )
+        more_posts = len(rows) > FEED_PAGE_SIZE
+        rows = [apply_pending_likes(row, viewer_id) for row in rows[:FEED_PAGE_SIZE]]
+        posts = create_entity_from_row(rows[::-1])
+        if more_posts:
+            # The next poll continues after the last one sent
+            post_since = rows[-1]["id"]
+        else:
+            post_since = max([max_post_id] + [row["id"] for row in rows])
+
+    comments = {}
+    if new_comments:
+        rows_by_post = get_comments_since(
+            post_ids, comment_since, limit=COMMENT_PAGE_SIZE
+        )
+        comments = {
+            post_id: create_comments_from_rows(post_id, rows)
+            for post_id, rows in rows_by_post.items()
+        }
+        fetched = [
+            c.get_id() for post_comments in comments.values() for c in post_comments
+        ]
+        if len(fetched) < COMMENT_PAGE_SIZE:
+            comment_since = max([max_comment_id] + fetched)
+        elif fetched:
+            # More remain; the next poll continues after the last one sent
+            comment_since = max(fetched)
+
+    likes = get_like_states(post_ids, viewer_id) if likes_changed else {}
+    return {
+        "posts": posts,
+        "more_posts": more_posts,
+        "comments": comments,
+        "likes": likes,
+        "post_since": post_since,
+        "comment_since": comment_since,
+        "like_token": current_like_token,
+    }
 
-    post_list = create_entity_from_row(result)
-    return post_list
+
+def get_comments_page_control(post_id, before_id=None, limit=COMMENT_PAGE_SIZE):
+    """Get one page of older comments on a post
+
+    Args:
+        post_id (int): Post whose comments to load
+        before_id (int): Oldest comment ID already shown; only older ones are returned
+        limit (int): Page size
+
+    Returns:
+        tuple: (list of Comment entities oldest first, cursor for the next page or None)
+    """
+    # Fetch one extra row to find out whether older comments remain
+    rows = get_comments_page(post_id, before_id=before_id, limit=limit + 1)
+    has_more = len(rows) > limit
+    comments = create_comments_from_rows(post_id, reversed(rows[:limit]))
+    next_cursor = comments[0].get_id() if has_more else None
+    return comments, next_cursor
+
+
+def invalidate_featured_posts(post_id, gained_like=False):
+    """Drop the cached featured list if a change to post_id could reorder it
+
+    A post outside the list that loses a like or is deleted cannot enter
+    it, so only new likes and changes to featured posts invalidate. Runs
+    after the request commits so the list is not reloaded from stale rows.
+    """
+
+    def invalidate():
+        cached = featured_posts_cache.peek(FEATURED_POSTS_KEY)
+        if cached is None:
+            return
+        if gained_like or any(row["id"] == post_id for row in cached):
+            featured_posts_cache.delete(FEATURED_POSTS_KEY)
+
+    call_after_commit(invalidate)
 
 
 # Get featured posts (top 5 by likes) for display
 def get_featured_posts_control():
 
-    result = get_featured_posts()
+    result = featured_posts_cache.get_or_load(FEATURED_POSTS_KEY, get_featured_posts)
     if not result:
         return []
 
@@ -99,37 +312,30 @@ def get_featured_posts_control():
             user=row.get("user_name", ""),
             content=row.get("caption", ""),
             image_url=row.get("image_path", ""),
-            likes=get_like_count(row["id"]),
+            likes=row.get("likes", 0),
             comments=[],  # Featured posts don't need comments
-            like_user_ids=row.get("like_user_ids", ""),
+            liked=bool(row.get("liked", False)),
+            profile_picture=row.get("profile_picture", ""),
         )
-        # Attach profile_picture to the post object
-        post.profile_picture = row.get("profile_picture", "")
         featured_list.append(post)
 
     return featured_list
 
 
-# Get a specific post by ID
-def get_post_by_id_control(post_id):
-    result = get_post_by_id(post_id)
+# Get a specific post by ID with its newest comments, for the permalink page
+def get_post_by_id_control(post_id, viewer_id=None):
+    result = get_post_by_id(
+        post_id, viewer_id, with_comments=True, comments_per_post=COMMENT_PAGE_SIZE
+    )
     if not result:
         return None
 
     # Convert raw DB data to Post entity
     row = result[0] if isinstance(result, list) else result
+    apply_pending_likes(row, viewer_id)
 
     # Get comments for this post
-    comments = []
-    for comment_data in row.get("comments", []):
-        comment = Comment(
-            id=comment_data["id"],
-            post_id=row["id"],
-            user=comment_data.get("user", ""),
-            content=comment_data.get("content", ""),
-            profile_picture=comment_data.get("profile_picture", ""),
-        )
-        comments.append(comment)
+    comments = create_comments_from_rows(row["id"], row.get("comments", []))
 
     # Create Post entity using only DB field names
     post = Post(
@@ -137,12 +343,12 @@ def get_post_by_id_control(post_id):
         user=row.get("user_name", ""),
         content=row.get("caption", ""),
         image_url=row.get("image_path", ""),
-        likes=get_like_count(row["id"]),
+        likes=row.get("likes", 0),
         comments=comments,
-        like_user_ids=row.get("like_user_ids", ""),
+        liked=bool(row.get("liked", False)),
+        comment_count=row.get("comment_count", len(comments)),
+        profile_picture=row.get("profile_picture", ""),
     )
-    # Attach profile_picture to the post object
-    post.profile_picture = row.get("profile_picture", "")
 
     return post
 
@@ -172,26 +378,187 @@ def create_post_control(user_id, content, image_file=None):
         image_file.save(filepath)
         image_url = f"/static/images/social/{unique_filename}"
 
-    return add_post(user_id, content, image_url)
+    post_id = add_post(user_id, content, image_url)
+    if post_id:
+        event = {"type": "post", "post_id": post_id, "user_id": user_id}
+        call_after_commit(lambda: feed_events.publish(event))
+    return post_id
 
 
 # Handle creation of a new comment on a post
-def create_comment_control(post_id, user_id, content):
+def create_comment_control(post_id, user_id, content, author=None):
+    """Add a comment and tell live feed clients about it
+
+    Args:
+        author (User): Commenting user, for the name and picture shown
+
+    Returns:
+        Comment: The new comment, or False if it was not saved
+    """
+    comment_id = add_comment(post_id, user_id, content)
+    if not comment_id:
+        return False
+    comment = Comment(
+        id=comment_id,
+        post_id=post_id,
+        user=author.get_name() if author else "",
+        content=content,
+        profile_picture=author.profile_picture if author else "",
+    )
+    event = {
+        "type": "comment",
+        "post_id": post_id,
+        "comment": get_comment_display_data(comment),
+    }
+    call_after_commit(lambda: feed_events.publish(event))
+    return comment
+
+
+def _write_like_batch(changes):
+    deltas = apply_like_changes(changes)
+    if deltas is not None:
+        return deltas, []
+    # Retry one toggle at a time so a single bad row does not drop the batch;
+    # apply_like_changes returns None only when the write failed
+    deltas, lost = {}, []
+    for change in changes:
+        written = apply_like_changes([change])
+        if written is None:
+            lost.append(change)
+            continue
+        for post_id, delta in written.items():
+            deltas[post_id] = deltas.get(post_id, 0) + delta
+    return deltas, lost
+
+
+def _on_likes_flushed(deltas):
+    for post_id, delta in deltas.items():
+        invalidate_featured_posts(post_id, gained_like=delta > 0)
+
+
+# Likes are buffered for LIKE_BUFFER_WINDOW seconds and written in batches,
+# so a burst on a popular post does not queue on its feed row lock.
+# Set it to 0 to write every toggle immediately.
+LIKE_BUFFER_WINDOW = float(os.getenv("LIKE_BUFFER_WINDOW", "0.5"))
+like_buffer = (
+    LikeBuffer(
+        partial(get_like_states, fresh=True),
+        _write_like_batch,
+        window=LIKE_BUFFER_WINDOW,
+        on_flush=_on_likes_flushed,
+    )
+    if LIKE_BUFFER_WINDOW > 0
+    else None
+)
+
+
+def get_pending_likes_control(user_id):
+    """Likes and unlikes by user_id still in the like buffer.
+
+    Pages that show like state include these in their ETag, so the user's
+    own reload is not answered 304 with a page from before the toggle.
+    """
+    if like_buffer is None:
+        return ()
+    return like_buffer.pending_toggles(int(user_id))
+
 
-    return add_comment(post_id, user_id, content)
+def _publish_like_count(post_id, like_count):
+    feed_events.publish({"type": "like", "post_id": post_id, "like_count": like_count})
+
+
+def _toggle_like(post_id, user_id, liked):
+    if like_buffer is not None:
+        success, like_count = like_buffer.toggle(post_id, user_id, liked)
+        if success:
+            _publish_like_count(post_id, like_count)
+        return success, like_count
+
+    success = (add_like if liked else remove_like)(post_id, user_id)
+    like_count = get_like_count(post_id)
+    if success:
+        invalidate_featured_posts(post_id, gained_like=liked)
+        call_after_commit(lambda: _publish_like_count(post_id, like_count))
+    return success, like_count
 
 
 def like_post_control(post_id, user_id):
-    return add_like(post_id, user_id)
+    """Like a post
+
+    Returns:
+        tuple: (success, like_count including likes not yet written)
+    """
+    return _toggle_like(post_id, user_id, True)
 
 
 def unlike_post_control(post_id, user_id):
-    return remove_like(post_id, user_id)
+    """Remove a like from a post
+
+    Returns:
+        tuple: (success, like_count including likes not yet written)
+    """
+    return _toggle_like(post_id, user_id, False)
+
+
+def sync_likes_control(user_id, toggles, post_ids=()):
+    """Apply several like toggles and read the like state of several posts
+
+    Args:
+        user_id (int): User liking and viewing the posts
+        toggles (list): (post_id, liked) pairs, applied in order
+        post_ids (iterable): Further posts whose counts the client shows
+
+    Returns:
+        tuple: (list of {"post_id", "success", "like_count"} per toggle,
+                list of {"id", "like_count", "liked"} per existing post)
+    """
+    if like_buffer is not None:
+        results, states = like_buffer.toggle_many(user_id, toggles, post_ids)
+        for (post_id, _), (success, like_count) in zip(toggles, results):
+            if success:
+                _publish_like_count(post_id, like_count)
+    else:
+        results = [
+            (like_post_control if liked else unlike_post_control)(post_id, user_id)
+            for post_id, liked in toggles
+        ]
+        wanted = sorted({post_id for post_id, _ in toggles} | set(post_ids))
+        states = get_like_states(wanted, user_id)
+
+    toggle_results = [
+        {"post_id": post_id, "success": success, "like_count": like_count}
+        for (post_id, _), (success, like_count) in zip(toggles, results)
+    ]
+    post_states = [
+        {"id": post_id, "like_count": like_count, "liked": liked}
+        for post_id, (like_count, liked) in sorted(states.items())
+    ]
+    return toggle_results, post_states
+
+
+def subscribe_feed_events_control(post_ids=None):
+    """Subscribe to live likes and comments on post_ids and to new posts
+
+    Returns:
+        Subscription: call close() when the client disconnects, or None if
+        this worker already serves as many streams as it allows
+    """
+    return feed_events.subscribe(set(post_ids) if post_ids else None)
+
+
+def get_comment_display_data(comment):
+    return {
+        "id": comment.get_id(),
+        "user": comment.get_user(),
+        "content": comment.get_content(),
+        "profile_picture": comment.get_profile_picture(),
+    }
 
 
 # Get formatted display data for posts
-def get_posts_display_data():
-    post_list = g.get("post_list")
+def get_posts_display_data(post_list=None):
+    if post_list is None:
+        post_list = g.get("post_list")
     if not post_list:
         return []
 
@@ -204,13 +571,11 @@ def get_posts_display_data():
                 "content": post.get_content(),
                 "image_url": post.get_image_url(),
                 "likes": post.get_likes(),
+                "liked": post.get_liked(),
+                "profile_picture": post.profile_picture,
+                "comment_count": post.get_comment_count(),
                 "comments": [
-                    {
-                        "id": comment.get_id(),
-                        "user": comment.get_user(),
-                        "content": comment.get_content(),
-                    }
-                    for comment in post.get_comments()
+                    get_comment_display_data(comment) for comment in post.get_comments()
                 ],
             }
         )
@@ -253,15 +618,7 @@ def delete_post(user_id: int, post_id: int) -> bool:
         )
         if os.path.exists(image_path):
             os.remove(image_path)
-    return ds_delete_post(post_id)
-
-
-# Get all posts by a specific user ID
-def get_posts_by_user_id_control(user_id):
-
-    result = get_posts_by_user_id(user_id)
-    if not result:
-        return []
-
-    post_list = create_entity_from_row(result)
-    return post_list
+    success = ds_delete_post(post_id)
+    if success:
+        invalidate_featured_posts(post_id)
+    return success
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import List
 
 
-@dataclass
+@dataclass(slots=True)
 class Comment:
 
     id: int
@@ -44,7 +44,7 @@ class Comment:
         self.profile_picture = profile_picture
 
 
-@dataclass
+@dataclass(slots=True)
 class Post:
 
     id: int
@@ -53,7 +53,9 @@ class Post:
     image_url: str
     likes: int
     comments: List[Comment] = field(default_factory=list)
-    like_user_ids: str = ""
+    liked: bool = False  # Liked by the user viewing the post
+    comment_count: int = 0  # Total comments; only the newest are loaded
+    profile_picture: str = ""  # Author's picture
 
     # Getters
     def get_id(self):
@@ -74,8 +76,14 @@ class Post:
     def get_comments(self):
         return self.comments
 
-    def get_like_user_ids(self):
-        return self.like_user_ids
+    def get_liked(self):
+        return self.liked
+
+    def get_comment_count(self):
+        return self.comment_count
+
+    def get_profile_picture(self):
+        return self.profile_picture
 
     # Setters
     def set_id(self, id):
@@ -96,5 +104,11 @@ class Post:
     def set_comments(self, comments):
         self.comments = comments
 
-    def set_like_user_ids(self, like_user_ids):
-        self.like_user_ids = like_user_ids
+    def set_liked(self, liked):
+        self.liked = liked
+
+    def set_comment_count(self, comment_count):
+        self.comment_count = comment_count
+
+    def set_profile_picture(self, profile_picture):
+        self.profile_picture = profile_picture
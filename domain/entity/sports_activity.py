@@ -1,8 +1,7 @@
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class SportsActivity:
     id: int
     user_id: int
@@ -12,7 +11,7 @@ class SportsActivity:
     date: str  # or use datetime if parsed
     location: str
     max_pax: int
-    user_id_list_join: Optional[str] = field(default=None)
+    participant_count: int = 0
 
     # --- Getters ---
     def get_id(self):
@@ -39,8 +38,8 @@ class SportsActivity:
     def get_max_pax(self):
         return self.max_pax
 
-    def get_user_id_list_join(self):
-        return self.user_id_list_join
+    def get_participant_count(self):
+        return self.participant_count
 
     # --- Setters ---
     def set_user_id(self, user_id: int):
@@ -64,10 +63,5 @@ class SportsActivity:
     def set_max_pax(self, max_pax: int):
         self.max_pax = max_pax
 
-    def set_user_id_list_join(self, user_id):
-        existing = self.user_id_list_join or ""
-        ids = existing.split(",") if existing else []
-
-        if str(user_id) not in ids:
-            ids.append(str(user_id))
-        self.user_id_list_join = ",".join(filter(None, ids))
+    def set_participant_count(self, participant_count: int):
+        self.participant_count = participant_count
@@ -72,9 +72,12 @@ CREATE TABLE IF NOT EXISTS `mydb`.`sports_activity` (
   `date` DATETIME NOT NULL,
   `location` VARCHAR(255) NOT NULL,
   `max_pax` INT NOT NULL,
-  `user_id_list_join` VARCHAR(255) NULL,
+  `participant_count` INT NOT NULL DEFAULT 0,
   PRIMARY KEY (`id`),
   INDEX `fk_user_id_idx` (`user_id` ASC) VISIBLE,
+  INDEX `idx_sports_activity_date` (`date`),
+  INDEX `idx_sports_activity_type_date` (`activity_type`, `date`),
+  FULLTEXT INDEX `ft_sports_activity_search` (`activity_name`, `skills_req`, `location`),
   CONSTRAINT `fk_user_id`
     FOREIGN KEY (`user_id`)
     REFERENCES `mydb`.`user` (`id`)
@@ -89,9 +92,10 @@ CREATE TABLE IF NOT EXISTS `mydb`.`feed` (
   `user_id` INT NOT NULL,
   `image_path` VARCHAR(255) NULL,  
   `caption` VARCHAR(255) NULL,
-  `like_user_ids` TEXT NULL,
+  `like_count` INT NOT NULL DEFAULT 0,
   PRIMARY KEY (`id`),
   INDEX `idx_feed_user_id` (`user_id`),
+  INDEX `idx_feed_like_count` (`like_count` DESC, `id` DESC),
   CONSTRAINT `fk_feed_user`
     FOREIGN KEY (`user_id`)
     REFERENCES `mydb`.`user` (`id`)
@@ -120,6 +124,55 @@ CREATE TABLE IF NOT EXISTS `mydb`.`comments` (
     ON UPDATE NO ACTION
 ) ENGINE = InnoDB;
 
+-- POST LIKE TABLE (one row per user liking a post)
+CREATE TABLE IF NOT EXISTS `mydb`.`post_like` (
+  `feed_id` INT NOT NULL,
+  `user_id` INT NOT NULL,
+  `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`feed_id`, `user_id`),
+  INDEX `idx_post_like_user_id` (`user_id`, `feed_id`),
+  CONSTRAINT `fk_post_like_feed`
+    FOREIGN KEY (`feed_id`)
+    REFERENCES `mydb`.`feed` (`id`)
+    ON DELETE CASCADE
+    ON UPDATE NO ACTION,
+  CONSTRAINT `fk_post_like_user`
+    FOREIGN KEY (`user_id`)
+    REFERENCES `mydb`.`user` (`id`)
+    ON DELETE CASCADE
+    ON UPDATE NO ACTION
+) ENGINE = InnoDB;
+
+-- ACTIVITY PARTICIPANT TABLE (one row per user joining an activity)
+CREATE TABLE IF NOT EXISTS `mydb`.`activity_participant` (
+  `activity_id` INT NOT NULL,
+  `user_id` INT NOT NULL,
+  `joined_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`activity_id`, `user_id`),
+  INDEX `idx_activity_participant_user_id` (`user_id`, `activity_id`),
+  CONSTRAINT `fk_activity_participant_activity`
+    FOREIGN KEY (`activity_id`)
+    REFERENCES `mydb`.`sports_activity` (`id`)
+    ON DELETE CASCADE
+    ON UPDATE NO ACTION,
+  CONSTRAINT `fk_activity_participant_user`
+    FOREIGN KEY (`user_id`)
+    REFERENCES `mydb`.`user` (`id`)
+    ON DELETE CASCADE
+    ON UPDATE NO ACTION
+) ENGINE = InnoDB;
+
+-- CONTENT VERSION TABLE (one counter per kind of page content)
+-- Bumped by the application after every committed write that changes what the
+-- feed, bulletin or profile pages show; the pages derive their ETags from it.
+CREATE TABLE IF NOT EXISTS `mydb`.`content_version` (
+  `name` VARCHAR(32) NOT NULL,
+  `version` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (`name`)
+) ENGINE = InnoDB;
+
+INSERT IGNORE INTO `mydb`.`content_version` (`name`) VALUES ('feed'), ('bulletin'), ('user');
+
 SET SQL_MODE=@OLD_SQL_MODE;
 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;
 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;
\ No newline at end of file
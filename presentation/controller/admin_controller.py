@@ -1,15 +1,25 @@
 import functools
 
-from flask import Blueprint, flash, redirect, render_template, url_for
+from flask import (
+    Blueprint,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_login import current_user, login_required
 
+from data_source.cache import get_cache_stats
+from data_source.db_connection import get_pool_stats
 from domain.control.admin_management import remove_social_post, remove_sports_activity
 from domain.control.bulletin_management import (
     get_bulletin_display_data,
     get_bulletin_listing,
     search_bulletin,
 )
-from domain.control.social_feed_management import get_all_posts_control
+from domain.control.social_feed_management import get_feed_page_control, like_buffer
 from domain.entity.forms import DeleteActivityForm, DeletePostForm, SearchForm
 
 ADMIN_BULLETIN_PAGE = "admin.bulletin_page"  # Name of the admin bulletin page route
@@ -48,11 +58,13 @@ def bulletin_page():
     delete_activity_form = DeleteActivityForm()
 
     query = None
+    cursor = next_cursor = None
     if search_form.validate_on_submit():
         query = search_form.query.data
         result = search_bulletin(query)
     else:
-        result = get_bulletin_listing()
+        cursor = request.args.get("cursor")
+        result, next_cursor = get_bulletin_listing(cursor)
 
     # No results or validation error on search?
     if not result and (query or search_form.errors):
@@ -70,6 +82,8 @@ def bulletin_page():
     return render_template(
         "admin/bulletin.html",
         bulletin_list=bulletin_list,
+        cursor=cursor,
+        next_cursor=next_cursor,
         query=query,
         search_form=search_form,
         delete_activity_form=delete_activity_form,
@@ -105,10 +119,15 @@ def delete_activity():
 @login_required
 @admin_required
 def feed_page():
-    posts = get_all_posts_control()
+    before_id = request.args.get("cursor", type=int)
+    posts, next_cursor = get_feed_page_control(before_id=before_id)
     delete_forms = {post.id: DeletePostForm(post_id=post.id) for post in posts}
     return render_template(
-        "admin/social_feed.html", posts=posts, delete_forms=delete_forms
+        "admin/social_feed.html",
+        posts=posts,
+        delete_forms=delete_forms,
+        cursor=before_id,
+        next_cursor=next_cursor,
     )
 
 
@@ -131,3 +150,24 @@ def delete_post():
             "error",
         )
     return redirect(url_for("admin.feed_page"))
+
+
+@admin_bp.route("/db_pool_stats", methods=["GET"])
+@login_required
+@admin_required
+def db_pool_stats():
+    return jsonify(get_pool_stats())
+
+
+@admin_bp.route("/cache_stats", methods=["GET"])
+@login_required
+@admin_required
+def cache_stats():
+    return jsonify(get_cache_stats())
+
+
+@admin_bp.route("/like_buffer_stats", methods=["GET"])
+@login_required
+@admin_required
+def like_buffer_stats():
+    return jsonify(like_buffer.stats() if like_buffer is not None else {})
@@ -1,19 +1,22 @@
 # controller.py
 import functools
 
-from flask import Blueprint, flash, redirect, render_template, url_for
+from flask import Blueprint, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
 
 from domain.control.bulletin_management import (
     create_activity,
     get_bulletin_display_data,
     get_bulletin_listing,
+    get_bulletin_listing_display_data,
     get_filtered_bulletins,
     get_host_name,
     join_activity_control,
     search_bulletin,
 )
 from domain.entity.forms import FilterForm, HostForm, JoinForm, SearchForm
+from presentation.controller.conditional_get import conditional_page
+from presentation.controller.streaming import stream_page
 
 BULLETIN_TEMPLATE = "bulletin/bulletin.html"
 BULLETIN_PAGE = "bulletin.bulletin_page"
@@ -37,16 +40,32 @@ def user_required(func):
 @bulletin_bp.route("/bulletin", methods=["GET", "POST"])
 @login_required
 @user_required
+@conditional_page("bulletin", "user")
 def bulletin_page():
     search_form = SearchForm()
     filter_form = FilterForm()
 
+    if request.method == "GET":
+        # Stream the listing: the head and navbar go out before the query runs
+        cursor = request.args.get("cursor")
+        return stream_page(
+            BULLETIN_TEMPLATE,
+            load_bulletin=functools.partial(get_bulletin_listing_display_data, cursor),
+            cursor=cursor,
+            query=None,
+            search_form=search_form,
+            filter_form=filter_form,
+            host_form=HostForm(),
+            join_form=JoinForm(),
+        )
+
     query = None
+    next_cursor = None
     if search_form.validate_on_submit():
         query = search_form.query.data
         result = search_bulletin(query)
     else:
-        result = get_bulletin_listing()
+        result, next_cursor = get_bulletin_listing()
 
     # No results or validation error on search?
     if not result and (query or search_form.errors):
@@ -66,6 +85,7 @@ def bulletin_page():
     return render_template(
         BULLETIN_TEMPLATE,
         bulletin_list=bulletin_list,
+        next_cursor=next_cursor,
         query=query,
         search_form=search_form,
         filter_form=filter_form,
@@ -89,13 +109,8 @@ def join_activity():
         return redirect(url_for(BULLETIN_PAGE))
 
     user_id = int(current_user.get_id())
-    if not join_activity_control(activity_id, user_id):
-        flash("Failed to join the activity. You may have already joined.", "error")
-    else:
-        flash(
-            "Successfully joined the activity! You may view it in your profile",
-            "success",
-        )
+    success, message = join_activity_control(activity_id, user_id)
+    flash(message, "success" if success else "error")
     return redirect(url_for(BULLETIN_PAGE))
 
 
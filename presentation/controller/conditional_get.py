@@ -0,0 +1,76 @@
+import functools
+import time
+
+from flask import Response, current_app, make_response, request, session
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+
+from domain.control.page_version import get_page_etag
+from domain.control.social_feed_management import get_pending_likes_control
+
+
+def _csrf_period():
+    # Cached pages carry CSRF tokens, which expire after WTF_CSRF_TIME_LIMIT;
+    # changing the ETag every half limit keeps a revalidated page's forms usable.
+    time_limit = current_app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+    if not time_limit:
+        return None
+    return int(time.time() // max(time_limit // 2, 1))
+
+
+def conditional_page(*sources):
+    """Answer GET requests with 304 Not Modified while a page is unchanged.
+
+    The ETag is derived from the content versions of sources plus the
+    viewer's own state, and is checked before the view runs, so an
+    unchanged page costs one small query instead of the full query and
+    template pipeline. Place below login_required.
+
+    Feed pages also depend on the viewer's likes that the like buffer has
+    not written yet; those are not in the content versions until a flush.
+
+    The ETag is weak: the body also holds per-render CSRF tokens, which do
+    not change what the page means.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Pending flash messages are shown once, so the page must render
+            if request.method != "GET" or session.get("_flashes"):
+                return func(*args, **kwargs)
+
+            if "csrf" in current_app.extensions:
+                # Create the session's CSRF token now rather than during the
+                # first render, so that render's ETag already includes it
+                generate_csrf()
+            etag = get_page_etag(
+                sources,
+                current_user.get_id(),
+                current_user.role,
+                request.full_path,
+                session.get("csrf_token"),
+                _csrf_period(),
+                (
+                    get_pending_likes_control(current_user.get_id())
+                    if "feed" in sources
+                    else ()
+                ),
+            )
+            if etag is None:
+                return func(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # Browsers may keep the page but must revalidate it on every visit
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
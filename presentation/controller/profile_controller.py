@@ -6,7 +6,6 @@ from flask import (
     flash,
     jsonify,
     redirect,
-    render_template,
     request,
     url_for,
 )
@@ -20,6 +19,8 @@ from domain.entity.forms import (
     PostEditForm,
     ProfileEditForm,
 )
+from presentation.controller.conditional_get import conditional_page
+from presentation.controller.streaming import stream_page
 
 PROFILE_PAGE = "profile_bp.fetch_profile"
 
@@ -44,6 +45,7 @@ def user_required(func):
 @profile_bp.route("/", methods=["GET", "POST"])
 @login_required
 @user_required
+@conditional_page("feed", "bulletin", "user")
 def fetch_profile():
     user_id = int(current_user.get_id())
     profile_manager = ProfileManagement()
@@ -52,7 +54,7 @@ def fetch_profile():
         profile_manager.get_user_activities_display_data()
     )
     user = profile_manager.get_user_profile(user_id)
-    user_posts = profile_manager.get_user_posts(user_id)
+    user_posts = profile_manager.iter_user_posts(user_id)
     form = ProfileEditForm(obj=user)
 
     if request.method == "POST" and form.validate_on_submit():
@@ -65,7 +67,9 @@ def fetch_profile():
                 flash(f"{field.capitalize()}: {error}", "error")
         return redirect(url_for(PROFILE_PAGE))
 
-    return render_template(
+    # Streamed, so the user's posts are rendered batch by batch as they are
+    # read instead of the whole page being built in memory first
+    return stream_page(
         "profile/profile.html",
         user=user,
         posts=user_posts,
@@ -1,10 +1,17 @@
 # presentation/controller/social_feed_controller.py
 import functools
+import hashlib
+import json
+import os
+import time
 
 from flask import (
     Blueprint,
+    Response,
+    current_app,
     flash,
     jsonify,
+    make_response,
     redirect,
     render_template,
     request,
@@ -12,26 +19,94 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required
+from markupsafe import Markup
 
-from data_source.social_feed_queries import get_like_count
+from data_source.cache import get_cache
+from data_source.db_connection import release_connection
 from data_source.user_queries import get_user_by_id, search_users_by_name
 from domain.control.social_feed_management import (
     create_comment_control,
     create_post_control,
-    get_all_posts_control,
+    get_comment_display_data,
+    get_comments_page_control,
     get_featured_posts_control,
+    get_feed_changes_control,
+    get_feed_page_control,
     get_post_by_id_control,
-    get_posts_by_user_id_control,
+    get_posts_display_data,
     like_post_control,
+    subscribe_feed_events_control,
+    sync_likes_control,
     unlike_post_control,
 )
 from domain.entity.forms import CommentForm, PostForm
+from presentation.controller.conditional_get import conditional_page
+from presentation.controller.streaming import deferred, stream_page
 
 SOCIAL_FEED_TEMPLATE = "socialfeed/social_feed.html"
+POST_LIST_TEMPLATE = "socialfeed/post_list.html"
+COMMENT_LIST_TEMPLATE = "socialfeed/comment_list.html"
+POST_BODY_TEMPLATE = "socialfeed/post_body.html"
 SOCIAL_FEED_FEED = "social_feed.feed"
+MAX_LIKE_BATCH = 100  # Posts one /feed/likes request may toggle or read
+MAX_EVENT_POSTS = 200  # Posts one /feed/events stream may follow
+EVENT_HEARTBEAT_SECONDS = 15  # Keeps proxies from closing an idle stream
+EVENT_STREAM_SECONDS = 300  # Streams end after this; EventSource reconnects
 
 social_feed_bp = Blueprint("social_feed", __name__, url_prefix="/feed")
 
+# Rendered post card pieces that look the same to every viewer, keyed by
+# post ID and a version derived from everything they show. Like counts,
+# the liked heart and the comment form are rendered per request.
+post_fragment_cache = get_cache(
+    "post_fragments",
+    int(os.getenv("POST_FRAGMENT_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("POST_FRAGMENT_CACHE_SIZE", "5000")),
+)
+
+
+def _fragment_version(*inputs):
+    return hashlib.blake2b(repr(inputs).encode(), digest_size=8).hexdigest()
+
+
+def _cached_fragment(key, template, **context):
+    html = post_fragment_cache.get(key)
+    if html is None:
+        html = render_template(template, **context)
+        post_fragment_cache.set(key, html)
+    return Markup(html)
+
+
+@social_feed_bp.app_template_global()
+def post_body_fragment(post):
+    """Author, caption and image of a post card.
+
+    A new version is rendered whenever the post is edited or its author
+    changes name or picture.
+    """
+    version = _fragment_version(
+        post.user, post.profile_picture, post.content, post.image_url
+    )
+    return _cached_fragment(f"body:{post.id}:{version}", POST_BODY_TEMPLATE, post=post)
+
+
+@social_feed_bp.app_template_global()
+def post_comments_fragment(post):
+    """The comments shown on a post card.
+
+    A new version is rendered whenever a comment is added or a commenter
+    changes name or picture.
+    """
+    version = _fragment_version(
+        [
+            (comment.id, comment.user, comment.content, comment.profile_picture)
+            for comment in post.comments
+        ]
+    )
+    return _cached_fragment(
+        f"comments:{post.id}:{version}", COMMENT_LIST_TEMPLATE, comments=post.comments
+    )
+
 
 def user_required(func):
     @functools.wraps(func)
@@ -46,37 +121,118 @@ def user_required(func):
 @social_feed_bp.route("/", methods=["GET"])
 @login_required
 @user_required
+@conditional_page("feed", "user")
 def feed():
-    posts = get_all_posts_control()
-    featured_posts = get_featured_posts_control()
+    """Stream the feed page: the head and navbar are sent before the posts
+    and featured sidebar are queried (see presentation/controller/streaming.py).
+    """
     post_form = PostForm()
     comment_form = CommentForm()
     liked_posts = session.get("liked_posts", [])
-    return render_template(
+    return stream_page(
         SOCIAL_FEED_TEMPLATE,
-        posts=posts,
-        featured_posts=featured_posts,
+        load_posts=functools.partial(get_feed_page_control, int(current_user.get_id())),
+        featured_posts=deferred(get_featured_posts_control),
         post_form=post_form,
         comment_form=comment_form,
         liked_posts=liked_posts,
     )
 
 
+@social_feed_bp.route("/page", methods=["GET"])
+@login_required
+@user_required
+def feed_page():
+    """Next page of posts for infinite scroll.
+
+    Query args: cursor (id of the oldest post already shown), optional
+    user_id to page through one user's posts, and format=json for data
+    instead of rendered post cards. The HTML response carries the cursor for
+    the following page in the X-Next-Cursor header (empty when done).
+    """
+    before_id = request.args.get("cursor", type=int)
+    user_id = request.args.get("user_id", type=int)
+    posts, next_cursor = get_feed_page_control(
+        int(current_user.get_id()), before_id=before_id, user_id=user_id
+    )
+    if request.args.get("format") == "json":
+        return jsonify(posts=get_posts_display_data(), next_cursor=next_cursor)
+
+    response = make_response(
+        render_template(POST_LIST_TEMPLATE, posts=posts, comment_form=CommentForm())
+    )
+    response.headers["X-Next-Cursor"] = str(next_cursor or "")
+    return response
+
+
+@social_feed_bp.route("/comments/<int:post_id>", methods=["GET"])
+@login_required
+@user_required
+def comments_page(post_id):
+    """Older comments on a post for the "View older comments" button.
+
+    Query args: cursor (id of the oldest comment already shown) and
+    format=json for data instead of rendered comments. The HTML response
+    carries the cursor for the following page in the X-Next-Cursor header
+    (empty when there are no older comments).
+    """
+    before_id = request.args.get("cursor", type=int)
+    comments, next_cursor = get_comments_page_control(post_id, before_id=before_id)
+    if request.args.get("format") == "json":
+        return jsonify(
+            comments=[get_comment_display_data(comment) for comment in comments],
+            next_cursor=next_cursor,
+        )
+
+    response = make_response(render_template(COMMENT_LIST_TEMPLATE, comments=comments))
+    response.headers["X-Next-Cursor"] = str(next_cursor or "")
+    return response
+
+
+def _form_errors(form):
+    return [
+        f"{field.capitalize()}: {error}"
+        for field, field_errors in form.errors.items()
+        for error in field_errors
+    ]
+
+
 @social_feed_bp.route("/create", methods=["POST"])
 @login_required
 @user_required
 def create_post():
+    """Create a post and redirect back to the feed.
+
+    With ?format=html the response is just the new post card (201) for
+    the page to insert, and ?format=json returns the post's data; both
+    answer errors with 400 and a JSON list of messages instead of flashing.
+    """
+    response_format = request.args.get("format")
     post_form = PostForm()
     if not post_form.validate_on_submit():
-        for field, field_errors in post_form.errors.items():
-            for error in field_errors:
-                flash(f"{field.capitalize()}: {error}", "error")
+        if response_format in ("html", "json"):
+            return jsonify(success=False, errors=_form_errors(post_form)), 400
+        for message in _form_errors(post_form):
+            flash(message, "error")
         return redirect(url_for(SOCIAL_FEED_FEED))
 
     user_id = int(current_user.get_id())
     content = post_form.content.data
     image_file = post_form.image.data
-    create_post_control(user_id, content, image_file)
+    post_id = create_post_control(user_id, content, image_file)
+    if response_format in ("html", "json"):
+        post = post_id and get_post_by_id_control(post_id, user_id)
+        if not post:
+            return jsonify(success=False, errors=["Post could not be created."]), 400
+        if response_format == "json":
+            return jsonify(success=True, post=get_posts_display_data([post])[0]), 201
+        return (
+            render_template(
+                POST_LIST_TEMPLATE, posts=[post], comment_form=CommentForm()
+            ),
+            201,
+        )
+
     flash("Post uploaded successfully!", "success")  # Flash success message for modal
     return redirect(url_for(SOCIAL_FEED_FEED))
 
@@ -85,16 +241,30 @@ def create_post():
 @login_required
 @user_required
 def create_comment(post_id):
+    """Add a comment and redirect back to the feed.
+
+    With ?format=html the response is just the rendered comment (201) and
+    ?format=json returns its data; both answer errors with 400 and a JSON
+    list of messages instead of flashing.
+    """
+    response_format = request.args.get("format")
     comment_form = CommentForm()
     if not comment_form.validate_on_submit():
-        for field, field_errors in comment_form.errors.items():
-            for error in field_errors:
-                flash(f"{field.capitalize()}: {error}", "error")
+        if response_format in ("html", "json"):
+            return jsonify(success=False, errors=_form_errors(comment_form)), 400
+        for message in _form_errors(comment_form):
+            flash(message, "error")
         return redirect(url_for(SOCIAL_FEED_FEED))
 
     user_id = int(current_user.get_id())
     content = comment_form.comment.data
-    create_comment_control(post_id, user_id, content)
+    comment = create_comment_control(post_id, user_id, content, author=current_user)
+    if response_format in ("html", "json"):
+        if not comment:
+            return jsonify(success=False, errors=["Comment could not be added."]), 400
+        if response_format == "json":
+            return jsonify(success=True, comment=get_comment_display_data(comment)), 201
+        return render_template(COMMENT_LIST_TEMPLATE, comments=[comment]), 201
     return redirect(url_for(SOCIAL_FEED_FEED))
 
 
@@ -104,8 +274,7 @@ def create_comment(post_id):
 def like_post(post_id):
     try:
         user_id = int(current_user.get_id())
-        success = like_post_control(post_id, user_id)
-        like_count = get_like_count(post_id)
+        success, like_count = like_post_control(post_id, user_id)
         return jsonify(success=success, like_count=like_count)
     except Exception as e:
         current_app.logger.error(f"[LIKE ERROR] {e}")
@@ -118,28 +287,181 @@ def like_post(post_id):
 def unlike_post(post_id):
     try:
         user_id = int(current_user.get_id())
-        success = unlike_post_control(post_id, user_id)
-        like_count = get_like_count(post_id)
+        success, like_count = unlike_post_control(post_id, user_id)
         return jsonify(success=success, like_count=like_count)
     except Exception as e:
         current_app.logger.error(f"[UNLIKE ERROR] {e}")
         return jsonify(success=False, error="An internal error occurred."), 500
 
 
+@social_feed_bp.route("/likes", methods=["POST"])
+@login_required
+@user_required
+def sync_likes():
+    """Toggle likes on and/or read like state for many posts at once.
+
+    JSON body: {"toggles": [{"post_id": 1, "liked": true}, ...],
+                "post_ids": [2, 3, ...]}
+    Both keys are optional. Responds with the result of every toggle and
+    the like count and liked-by-me flag of every post named in either list.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        toggles = [
+            (int(toggle["post_id"]), toggle["liked"])
+            for toggle in data.get("toggles", [])
+        ]
+        post_ids = [int(post_id) for post_id in data.get("post_ids", [])]
+        # Only a JSON true/false; bool("false") would record a like
+        if not all(isinstance(liked, bool) for _, liked in toggles):
+            raise ValueError("liked must be a boolean")
+    except (KeyError, TypeError, ValueError):
+        return jsonify(success=False, error="Invalid like request."), 400
+    if len(toggles) + len(post_ids) > MAX_LIKE_BATCH:
+        return (
+            jsonify(
+                success=False, error=f"At most {MAX_LIKE_BATCH} posts per request."
+            ),
+            400,
+        )
+
+    try:
+        results, posts = sync_likes_control(
+            int(current_user.get_id()), toggles, post_ids
+        )
+        return jsonify(success=True, results=results, posts=posts)
+    except Exception as e:
+        current_app.logger.error(f"[LIKE ERROR] {e}")
+        return jsonify(success=False, error="An internal error occurred."), 500
+
+
+def _event_stream(subscription):
+    deadline = time.monotonic() + EVENT_STREAM_SECONDS
+    try:
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            event = subscription.get(timeout=EVENT_HEARTBEAT_SECONDS)
+            if subscription.overflowed:
+                # Events were dropped; the client re-reads its like counts
+                subscription.overflowed = False
+                yield "event: resync\ndata: {}\n\n"
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
+
+
+@social_feed_bp.route("/events", methods=["GET"])
+@login_required
+@user_required
+def feed_events():
+    """Server-sent events with live like counts, comments and new posts.
+
+    Query args: posts, a comma-separated list of the post IDs the client
+    shows; like and comment events for other posts are not sent. Without
+    it every like and comment is sent.
+
+    Each stream holds a worker thread, so only MAX_EVENT_STREAMS are served
+    at once. Further clients get 204, which tells EventSource not to
+    reconnect; the page then polls /feed/changes.
+    """
+    try:
+        post_ids = [
+            int(post_id)
+            for post_id in request.args.get("posts", "").split(",")
+            if post_id
+        ][:MAX_EVENT_POSTS]
+    except ValueError:
+        return jsonify(success=False, error="Invalid post list."), 400
+
+    subscription = subscribe_feed_events_control(post_ids)
+    if subscription is None:
+        return "", 204
+    # The stream stays open for minutes; do not keep a pooled DB connection
+    release_connection()
+    response = Response(
+        _event_stream(subscription),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Also unsubscribes when the client leaves before the stream starts
+    response.call_on_close(subscription.close)
+    return response
+
+
+@social_feed_bp.route("/changes", methods=["GET"])
+@login_required
+@user_required
+def feed_changes():
+    """What changed since the client's last poll, or 204 if nothing did.
+
+    Query args: posts (comma-separated IDs of the posts shown), post_since
+    and comment_since (newest post and comment IDs seen), and like_token
+    from the previous response. Responds with new posts (data and rendered
+    cards), new comments on the shown posts, changed like counts and the
+    values to send on the next poll.
+    """
+    try:
+        post_ids = [
+            int(post_id)
+            for post_id in request.args.get("posts", "").split(",")
+            if post_id
+        ][:MAX_LIKE_BATCH]
+    except ValueError:
+        return jsonify(success=False, error="Invalid post list."), 400
+    changes = get_feed_changes_control(
+        int(current_user.get_id()),
+        post_ids,
+        request.args.get("post_since", 0, type=int),
+        request.args.get("comment_since", 0, type=int),
+        request.args.get("like_token"),
+    )
+    if changes is None:
+        return "", 204
+
+    posts_html = (
+        render_template(
+            POST_LIST_TEMPLATE, posts=changes["posts"], comment_form=CommentForm()
+        )
+        if changes["posts"]
+        else ""
+    )
+    return jsonify(
+        posts=get_posts_display_data() if changes["posts"] else [],
+        posts_html=posts_html,
+        more_posts=changes["more_posts"],
+        comments=[
+            {
+                "post_id": post_id,
+                "comment": get_comment_display_data(comment),
+            }
+            for post_id, post_comments in changes["comments"].items()
+            for comment in post_comments
+        ],
+        likes=[
+            {"id": post_id, "like_count": like_count, "liked": liked}
+            for post_id, (like_count, liked) in sorted(changes["likes"].items())
+        ],
+        post_since=changes["post_since"],
+        comment_since=changes["comment_since"],
+        like_token=changes["like_token"],
+    )
+
+
 @social_feed_bp.route("/post/<int:post_id>", methods=["GET"])
 @login_required
 @user_required
 def view_post(post_id):
-    posts = get_all_posts_control()
-    featured_posts = get_featured_posts_control()
-    target = get_post_by_id_control(post_id)
+    target = get_post_by_id_control(post_id, int(current_user.get_id()))
     if not target:
         return redirect(url_for(SOCIAL_FEED_FEED))
 
-    filtered = [p for p in posts if p.id == post_id]
+    featured_posts = get_featured_posts_control()
     return render_template(
         SOCIAL_FEED_TEMPLATE,
-        posts=filtered,
+        posts=[target],
         featured_posts=featured_posts,
         filtered_post_id=post_id,
         post_form=PostForm(),
@@ -174,12 +496,15 @@ def search_users():
 @login_required
 @user_required
 def view_user_posts(user_id):
-    posts = get_posts_by_user_id_control(user_id)
+    posts, next_cursor = get_feed_page_control(
+        int(current_user.get_id()), user_id=user_id
+    )
     featured = get_featured_posts_control()
     user_data = get_user_by_id(user_id) or {}
     return render_template(
         SOCIAL_FEED_TEMPLATE,
         posts=posts,
+        next_cursor=next_cursor,
         featured_posts=featured,
         filtered_user_id=user_id,
         filtered_user_name=user_data.get("name"),
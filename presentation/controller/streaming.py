@@ -0,0 +1,47 @@
+from flask import Response, get_flashed_messages, stream_template
+from flask_wtf.csrf import generate_csrf
+
+# Rendered output is sent in pieces of at least this many bytes. Small
+# enough that the <head> and navbar go out before the page's list is
+# queried, large enough not to send one chunk per template expression.
+STREAM_CHUNK_SIZE = 4096
+
+
+def deferred(load, *args, **kwargs):
+    """Iterable that calls load(*args, **kwargs) when first iterated.
+
+    Pass it to stream_page() so the query runs while the template is
+    already being sent, rather than before the first byte.
+    """
+    yield from load(*args, **kwargs)
+
+
+def _coalesce(chunks, size):
+    buffer, buffered = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_page(template, **context):
+    """Render template into a streamed HTML response.
+
+    The response headers, including the session cookie, are sent before
+    the template runs, so session writes that rendering would make are done
+    here first: the CSRF token is generated and flash messages are popped
+    (the template's get_flashed_messages() gets them from the request).
+    """
+    generate_csrf()
+    get_flashed_messages(with_categories=True)
+    response = Response(
+        _coalesce(stream_template(template, **context), STREAM_CHUNK_SIZE),
+        mimetype="text/html",
+    )
+    # Let nginx pass chunks on as they come instead of buffering the page
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,102 @@
+"""Measure memory and construction time of the domain entities.
+
+Run from the repository root:
+
+    python -m tests.benchmark.entity_memory
+
+The entities are slotted dataclasses. Each one is compared with a regular
+dataclass that has the same fields, so it keeps a per-instance __dict__
+(which is how the entities were defined before).
+"""
+
+import dataclasses
+import time
+import tracemalloc
+from datetime import datetime
+
+from domain.entity.social_post import Comment, Post
+from domain.entity.sports_activity import SportsActivity
+from domain.entity.user import User
+
+COUNT = 20000
+ROUNDS = 5
+
+
+def with_dict(cls):
+    """A regular dataclass with the same fields as cls."""
+    return dataclasses.make_dataclass(
+        cls.__name__,
+        [
+            (
+                f.name,
+                f.type,
+                dataclasses.field(default=f.default, default_factory=f.default_factory),
+            )
+            for f in dataclasses.fields(cls)
+        ],
+    )
+
+
+def sample_args(cls, i):
+    if cls.__name__ == "Comment":
+        return dict(id=i, post_id=i, user=f"user{i}", content=f"comment {i}")
+    if cls.__name__ == "Post":
+        return dict(
+            id=i,
+            user=f"user{i}",
+            content=f"post {i}",
+            image_url="",
+            likes=i,
+            comment_count=3,
+            profile_picture="",
+        )
+    if cls.__name__ == "SportsActivity":
+        return dict(
+            id=i,
+            user_id=i,
+            activity_name=f"activity {i}",
+            activity_type="Football",
+            skills_req="Beginner",
+            date=datetime(2030, 1, 1),
+            location="Court",
+            max_pax=10,
+        )
+    return dict(id=i, name=f"user{i}", password="", email=f"user{i}@example.com")
+
+
+def measure(cls):
+    # Build the arguments first so only the objects themselves are counted
+    args = [sample_args(cls, i) for i in range(COUNT)]
+    tracemalloc.start()
+    objects = [cls(**kwargs) for kwargs in args]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+
+    # Timed separately: tracing slows allocation down
+    elapsed = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        objects = [cls(**kwargs) for kwargs in args]
+        elapsed = min(elapsed, time.perf_counter() - start)
+        del objects
+    return size / COUNT, elapsed / COUNT * 1e9
+
+
+def main():
+    print(f"{COUNT} objects each")
+    print(
+        f"{'entity':>15} {'dict B/obj':>11} {'slots B/obj':>12} "
+        f"{'dict ns/obj':>12} {'slots ns/obj':>13}"
+    )
+    for cls in (Post, Comment, SportsActivity, User):
+        dict_bytes, dict_ns = measure(with_dict(cls))
+        slots_bytes, slots_ns = measure(cls)
+        print(
+            f"{cls.__name__:>15} {dict_bytes:>11.0f} {slots_bytes:>12.0f} "
+            f"{dict_ns:>12.0f} {slots_ns:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
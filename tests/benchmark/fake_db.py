@@ -0,0 +1,296 @@
+import re
+import time
+from datetime import date
+
+
+class FakeCursor:
+    def __init__(self, db, dictionary=False):
+        self._db = db
+        self._dictionary = dictionary
+        self._rows = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        self._db.round_trips += 1
+        if self._db.latency:
+            time.sleep(self._db.latency)
+        self._db.queries.append(" ".join(query.split()))
+        if self._db.queries[-1].startswith("INSERT INTO"):
+            self._rows = []
+            self.lastrowid = self._db.insert(self._db.queries[-1], params)
+            self.rowcount = 1
+            return
+        self._rows = list(self._db.handle(query, params))
+        self.rowcount = len(self._rows)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows if self._dictionary else [tuple(r.values()) for r in rows]
+
+    def fetchone(self):
+        if not self._rows:
+            return None
+        row = self._rows.pop(0)
+        return row if self._dictionary else tuple(row.values())
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows if self._dictionary else [tuple(r.values()) for r in rows]
+
+    def __iter__(self):
+        while self._rows:
+            yield self.fetchone()
+
+    def close(self):
+        self._rows = []
+
+
+class FakeConnection:
+    """Stand-in for a pooled connection that counts statements sent."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self, dictionary=False, **kwargs):
+        return FakeCursor(self._db, dictionary=dictionary)
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeFeedDatabase:
+    """In-memory feed/comments/user tables answering the social feed queries.
+
+    Only the query shapes used by data_source.social_feed_queries are
+    understood; this is for counting round trips, not for testing SQL.
+    """
+
+    def __init__(self, num_posts, comments_per_post=3, likes_per_post=5, latency=0):
+        # Seconds each query takes, to simulate a database across the network
+        self.latency = latency
+        self.round_trips = 0
+        self.connections = 0
+        self.queries = []
+        self.users = {
+            uid: {"id": uid, "name": f"user{uid}", "profile_picture": ""}
+            for uid in range(1, 51)
+        }
+        self.posts = []
+        self.likes = {}
+        self.comments = []
+        # Bumped by content_version_queries.bump_content_version()
+        self.content_versions = {"feed": 0, "bulletin": 0, "user": 0}
+        comment_id = 1
+        for post_id in range(1, num_posts + 1):
+            self.posts.append(
+                {
+                    "id": post_id,
+                    "user_id": 1 + post_id % 50,
+                    "caption": f"post {post_id}",
+                    "image_path": None,
+                }
+            )
+            self.likes[post_id] = {
+                1 + (post_id + i) % 50 for i in range(likes_per_post)
+            }
+            for _ in range(comments_per_post):
+                self.comments.append(
+                    {
+                        "id": comment_id,
+                        "feed_id": post_id,
+                        "user_id": 1 + comment_id % 50,
+                        "comments": f"comment {comment_id}",
+                    }
+                )
+                comment_id += 1
+
+    def connect(self):
+        self.connections += 1
+        return FakeConnection(self)
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.connections = 0
+        self.queries = []
+
+    def _post_row(self, post, viewer_id=None):
+        user = self.users[post["user_id"]]
+        row = dict(post)
+        row["user_name"] = user["name"]
+        row["profile_picture"] = user["profile_picture"]
+        row["likes"] = len(self.likes[post["id"]])
+        row["liked"] = int(viewer_id in self.likes[post["id"]])
+        return row
+
+    def _comment_row(self, comment):
+        user = self.users[comment["user_id"]]
+        row = dict(comment)
+        row["user_name"] = user["name"]
+        row["profile_picture"] = user["profile_picture"]
+        return row
+
+    def insert(self, query, params):
+        if query.startswith("INSERT INTO comments"):
+            feed_id, user_id, content = params
+            comment_id = max((c["id"] for c in self.comments), default=0) + 1
+            self.comments.append(
+                {
+                    "id": comment_id,
+                    "feed_id": feed_id,
+                    "user_id": user_id,
+                    "comments": content,
+                }
+            )
+            return comment_id
+        if query.startswith("INSERT INTO feed"):
+            user_id, caption, image_path = params
+            post_id = max((p["id"] for p in self.posts), default=0) + 1
+            self.posts.append(
+                {
+                    "id": post_id,
+                    "user_id": user_id,
+                    "caption": caption,
+                    "image_path": image_path,
+                }
+            )
+            self.likes[post_id] = set()
+            return post_id
+        return None
+
+    def handle(self, query, params):
+        q = " ".join(query.split())
+        params = tuple(params or ())
+        if q.startswith("SELECT CURDATE(), name, version FROM content_version"):
+            return [
+                {
+                    "today": date.today(),
+                    "name": name,
+                    "version": self.content_versions[name],
+                }
+                for name in params
+                if name in self.content_versions
+            ]
+        if q.startswith("UPDATE content_version SET version = version + 1"):
+            self.content_versions[params[0]] += 1
+            return []
+        if q.startswith("SELECT like_count FROM feed"):
+            return [{"like_count": len(self.likes.get(params[0], ()))}]
+        if q.startswith("SELECT f.id, f.like_count, EXISTS("):
+            user_id, post_ids = params[0], params[1:]
+            return [
+                {
+                    "id": post_id,
+                    "like_count": len(self.likes[post_id]),
+                    "liked": int(user_id in self.likes[post_id]),
+                }
+                for post_id in post_ids
+                if post_id in self.likes
+            ]
+        if q.startswith("SELECT (SELECT COALESCE(MAX(id), 0) FROM feed)"):
+            post_ids = set(params[: len(params) // 2])
+            return [
+                {
+                    "max_post_id": max((p["id"] for p in self.posts), default=0),
+                    "max_comment_id": max(
+                        (c["id"] for c in self.comments if c["feed_id"] in post_ids),
+                        default=0,
+                    ),
+                    "like_token": (
+                        hash(
+                            tuple(
+                                sorted((pid, len(self.likes[pid])) for pid in post_ids)
+                            )
+                        )
+                        if post_ids
+                        else 0
+                    ),
+                }
+            ]
+        if "FROM comments c" in q:
+            if "ROW_NUMBER()" in q:
+                # Newest per_post comments of each post plus its total
+                wanted, per_post = set(params[:-1]), params[-1]
+                by_post = {}
+                for c in self.comments:
+                    if c["feed_id"] in wanted:
+                        by_post.setdefault(c["feed_id"], []).append(c)
+                rows = []
+                for post_comments in by_post.values():
+                    for c in post_comments[-per_post:]:
+                        row = self._comment_row(c)
+                        row["comment_count"] = len(post_comments)
+                        rows.append(row)
+                return sorted(rows, key=lambda r: r["id"])
+            if "IN (" in q and "c.id > %s" in q:
+                # New comments on the given posts, oldest first
+                count = q.count("%s", q.index("IN ("), q.index("c.id > %s"))
+                wanted, after_id = set(params[:count]), params[count]
+                rows = [
+                    self._comment_row(c)
+                    for c in self.comments
+                    if c["feed_id"] in wanted and c["id"] > after_id
+                ]
+                rows.sort(key=lambda r: r["id"])
+                return rows[: params[count + 1]] if "LIMIT %s" in q else rows
+            if "IN (" in q:
+                wanted = set(params)
+                rows = [
+                    self._comment_row(c)
+                    for c in self.comments
+                    if c["feed_id"] in wanted
+                ]
+                return sorted(rows, key=lambda r: r["id"])
+            rows = [
+                self._comment_row(c)
+                for c in self.comments
+                if c["feed_id"] == params[0]
+                and ("c.id < %s" not in q or c["id"] < params[1])
+            ]
+            rows.sort(key=lambda r: r["id"], reverse="ORDER BY c.id DESC" in q)
+            if "LIMIT %s" in q:
+                rows = rows[: params[-1]]
+            return rows
+        if "FROM feed f" in q:
+            # Bind placeholders to the filters they belong to, in query order
+            filters = {}
+            names = {
+                "pl.user_id = %s": "viewer_id",
+                "f.id = %s": "id",
+                "f.user_id = %s": "user_id",
+                "f.id < %s": "before_id",
+                "f.id > %s": "after_id",
+                "LIMIT %s": "limit",
+            }
+            for match in re.finditer("|".join(re.escape(n) for n in names), q):
+                filters[names[match.group(0)]] = params[len(filters)]
+            posts = self.posts
+            if "id" in filters:
+                posts = [p for p in posts if p["id"] == filters["id"]]
+            if "user_id" in filters:
+                posts = [p for p in posts if p["user_id"] == filters["user_id"]]
+            if "before_id" in filters:
+                posts = [p for p in posts if p["id"] < filters["before_id"]]
+            if "after_id" in filters:
+                posts = [p for p in posts if p["id"] > filters["after_id"]]
+            posts = sorted(
+                posts, key=lambda p: p["id"] if "ORDER BY f.id ASC" in q else -p["id"]
+            )
+            if "ORDER BY f.like_count DESC" in q:
+                posts.sort(key=lambda p: (-len(self.likes[p["id"]]), -p["id"]))
+            if "limit" in filters:
+                posts = posts[: filters["limit"]]
+            elif "LIMIT 5" in q:
+                posts = posts[:5]
+            # Only the returned page is materialized, like a real result set
+            return [self._post_row(p, filters.get("viewer_id")) for p in posts]
+        return []
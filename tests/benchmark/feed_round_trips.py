@@ -0,0 +1,51 @@
+"""Count database round trips needed to load the social feed.
+
+Run from the repository root:
+
+    python -m tests.benchmark.feed_round_trips
+
+Before comments were batch-loaded, get_all_posts issued 1 + N comment
+queries plus N get_like_count queries for N posts. Comments are now a
+single IN-list query and like counts come from the fetched rows, so a
+feed render costs the same number of round trips regardless of N.
+
+The post permalink used to load the whole feed and filter it in Python;
+it now fetches the one post and its newest comments in two queries.
+"""
+
+from data_source import social_feed_queries
+from tests.benchmark.fake_db import FakeFeedDatabase
+
+
+def count_round_trips(num_posts):
+    db = FakeFeedDatabase(num_posts)
+    social_feed_queries.get_connection = db.connect
+    posts = social_feed_queries.get_all_posts()
+    assert len(posts) == num_posts
+    comment_queries = sum(1 for q in db.queries if "FROM comments c" in q)
+    return db.round_trips, comment_queries
+
+
+def count_permalink_round_trips(num_posts):
+    db = FakeFeedDatabase(num_posts)
+    social_feed_queries.get_connection = db.connect
+    post = social_feed_queries.get_post_by_id(
+        1, with_comments=True, comments_per_post=20
+    )
+    assert post is not None
+    return db.round_trips
+
+
+def main():
+    print(
+        f"{'posts':>8} {'round trips':>12} {'comment queries':>16} "
+        f"{'permalink trips':>16}"
+    )
+    for num_posts in (10, 100, 1000):
+        round_trips, comment_queries = count_round_trips(num_posts)
+        permalink = count_permalink_round_trips(num_posts)
+        print(f"{num_posts:>8} {round_trips:>12} {comment_queries:>16} {permalink:>16}")
+
+
+if __name__ == "__main__":
+    main()
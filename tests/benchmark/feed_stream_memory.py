@@ -0,0 +1,64 @@
+"""Compare peak memory of loading the whole feed as a list vs streaming it.
+
+Run from the repository root:
+
+    python -m tests.benchmark.feed_stream_memory
+
+get_all_posts fetches every row, adds alias keys to each, and
+create_entity_from_row then builds a Post per row and keeps the list in g,
+so peak memory grows with the size of the feed. iter_posts_control reads
+POST_STREAM_BATCH_SIZE rows per query and yields one Post at a time, so its
+peak stays flat however many posts there are.
+"""
+
+import tracemalloc
+
+from flask import Flask
+
+from data_source import social_feed_queries
+from domain.control.social_feed_management import (
+    FEED_COMMENTS_PER_POST,
+    create_entity_from_row,
+    iter_posts_control,
+)
+from tests.benchmark.fake_db import FakeFeedDatabase
+
+
+class _LastQueryOnly(list):
+    def append(self, item):
+        self[:] = [item]
+
+
+def peak_kib(load):
+    app = Flask(__name__)
+    with app.app_context():
+        tracemalloc.start()
+        load()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def load_list():
+    rows = social_feed_queries.get_all_posts(comments_per_post=FEED_COMMENTS_PER_POST)
+    return len(create_entity_from_row(rows))
+
+
+def load_stream():
+    return sum(1 for _ in iter_posts_control(comments_per_post=FEED_COMMENTS_PER_POST))
+
+
+def main():
+    print(f"{'posts':>8} {'list KiB':>10} {'stream KiB':>11}")
+    for num_posts in (100, 1000, 5000):
+        db = FakeFeedDatabase(num_posts)
+        social_feed_queries.get_connection = db.connect
+        # Keep the fake database's own query log out of the measurement
+        db.queries = _LastQueryOnly()
+        listed = peak_kib(load_list)
+        streamed = peak_kib(load_stream)
+        print(f"{num_posts:>8} {listed:>10.0f} {streamed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
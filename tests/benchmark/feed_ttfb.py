@@ -0,0 +1,114 @@
+"""Compare time to first byte of the feed page rendered whole vs streamed.
+
+Run from the repository root:
+
+    python -m tests.benchmark.feed_ttfb
+
+Every query against the fake database takes LATENCY seconds. With
+render_template the posts and featured sidebar are loaded and the whole
+page is rendered before anything is sent; stream_page sends the head and
+navbar first and runs those queries while the rest of the page renders.
+"""
+
+import functools
+import os
+import time
+
+from flask import Flask, render_template
+from flask_login import LoginManager, login_user
+from flask_wtf import CSRFProtect
+
+from data_source import social_feed_queries
+from domain.control.social_feed_management import (
+    featured_posts_cache,
+    get_featured_posts_control,
+    get_feed_page_control,
+)
+from domain.entity.forms import CommentForm, PostForm
+from domain.entity.user import User
+from presentation.controller.bulletin_controller import bulletin_bp
+from presentation.controller.profile_controller import profile_bp
+from presentation.controller.social_feed_controller import (
+    SOCIAL_FEED_TEMPLATE,
+    social_feed_bp,
+)
+from presentation.controller.streaming import deferred, stream_page
+from tests.benchmark.fake_db import FakeFeedDatabase
+
+LATENCY = 0.02
+ROUNDS = 10
+
+
+def make_app():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(root, "presentation", "templates"),
+        static_folder=os.path.join(root, "presentation", "static"),
+    )
+    app.config.update(SECRET_KEY="benchmark")
+    CSRFProtect(app)
+    login_manager = LoginManager(app)
+    login_manager.user_loader(lambda user_id: None)
+    for blueprint in (social_feed_bp, bulletin_bp, profile_bp):
+        app.register_blueprint(blueprint)
+    # The navbar links to logout; the login blueprint itself is not needed
+    app.add_url_rule("/logout", "login.logout")
+    return app
+
+
+def render_whole(viewer_id):
+    posts, next_cursor = get_feed_page_control(viewer_id)
+    html = render_template(
+        SOCIAL_FEED_TEMPLATE,
+        posts=posts,
+        next_cursor=next_cursor,
+        featured_posts=get_featured_posts_control(),
+        post_form=PostForm(),
+        comment_form=CommentForm(),
+        liked_posts=[],
+    )
+    return iter([html])
+
+
+def render_streamed(viewer_id):
+    response = stream_page(
+        SOCIAL_FEED_TEMPLATE,
+        load_posts=functools.partial(get_feed_page_control, viewer_id),
+        featured_posts=deferred(get_featured_posts_control),
+        post_form=PostForm(),
+        comment_form=CommentForm(),
+        liked_posts=[],
+    )
+    return iter(response.response)
+
+
+def time_page(app, render):
+    first_byte = total = 0.0
+    for _ in range(ROUNDS):
+        featured_posts_cache.clear()
+        with app.test_request_context("/feed/"):
+            login_user(User(id=1, name="user1", password="", email="", role="user"))
+            start = time.perf_counter()
+            chunks = render(1)
+            next(chunks)
+            first_byte += time.perf_counter() - start
+            for _ in chunks:
+                pass
+            total += time.perf_counter() - start
+    return first_byte / ROUNDS * 1000, total / ROUNDS * 1000
+
+
+def main():
+    app = make_app()
+    db = FakeFeedDatabase(100, latency=LATENCY)
+    social_feed_queries.get_connection = db.connect
+    print(f"{LATENCY * 1000:.0f} ms per query")
+    print(f"{'render':>10} {'TTFB ms':>9} {'total ms':>9}")
+    for name, render in (("whole", render_whole), ("streamed", render_streamed)):
+        first_byte, total = time_page(app, render)
+        print(f"{name:>10} {first_byte:>9.1f} {total:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Time rendering a page of post cards with a cold and a warm fragment cache.
+
+Run from the repository root:
+
+    python -m tests.benchmark.post_card_render
+
+Each card's author/caption/image and comment list are cached by post ID
+and content version, so a warm render only fills in the like counts, the
+liked heart and the comment form around cached HTML.
+"""
+
+import os
+import time
+
+from flask import Flask, render_template
+from flask_login import LoginManager
+
+from domain.control.social_feed_management import create_entity_from_row
+from domain.entity.forms import CommentForm
+from presentation.controller.social_feed_controller import (
+    POST_LIST_TEMPLATE,
+    post_fragment_cache,
+    social_feed_bp,
+)
+from tests.benchmark.fake_db import FakeFeedDatabase
+
+ROUNDS = 50
+
+
+def make_app():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(root, "presentation", "templates"),
+        static_folder=os.path.join(root, "presentation", "static"),
+    )
+    app.config.update(SECRET_KEY="benchmark", WTF_CSRF_ENABLED=False)
+    login_manager = LoginManager(app)
+    login_manager.user_loader(lambda user_id: None)
+    app.register_blueprint(social_feed_bp)
+    return app
+
+
+def feed_rows(num_posts):
+    db = FakeFeedDatabase(num_posts)
+    rows = []
+    for post in db.posts:
+        row = db._post_row(post)
+        row["comments"] = [
+            {
+                "id": c["id"],
+                "user": db.users[c["user_id"]]["name"],
+                "content": c["comments"],
+                "profile_picture": "",
+            }
+            for c in db.comments
+            if c["feed_id"] == post["id"]
+        ]
+        rows.append(row)
+    return rows
+
+
+def time_render(posts):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        render_template(POST_LIST_TEMPLATE, posts=posts, comment_form=CommentForm())
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    app = make_app()
+    print(f"{'posts':>8} {'uncached ms':>12} {'cached ms':>10}")
+    for num_posts in (10, 50):
+        with app.test_request_context("/feed/"):
+            posts = create_entity_from_row(feed_rows(num_posts))
+            post_fragment_cache.max_entries = 0
+            uncached = time_render(posts)
+            post_fragment_cache.max_entries = None
+            time_render(posts)
+            cached = time_render(posts)
+        print(f"{num_posts:>8} {uncached:>12.2f} {cached:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
 import io
 import os
+import unittest
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+import mysql.connector
 import pytest
+from flask import Flask
 from werkzeug.utils import secure_filename
 from wtforms import Form
 from wtforms.fields import DateTimeLocalField
 from wtforms.validators import DataRequired, ValidationError
 
+from data_source import bulletin_queries
+from data_source.cache import TTLCache
+from data_source.connection_pool import ConnectionPool, PoolExhaustedError
+from data_source.db_connection import RequestConnection, init_db_connection
+from data_source.like_buffer import LikeBuffer
+from domain.control import feed_events, social_feed_management
+from domain.control.bulletin_management import join_activity_control
+from domain.entity.social_post import Post
+
 
 class DummyForm(Form):
     date = DateTimeLocalField(
@@ -154,10 +167,375 @@ def test_host_activity_date_in_future():
     assert success, "ValidationError was raised even though the date is in the future"
 
 
+class FakeConnection:
+    def __init__(self):
+        self.in_transaction = False
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        if self.closed:
+            raise OSError("connection closed")
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_connection_pool_reuse_and_exhaustion():
+    pool = ConnectionPool(FakeConnection, pool_size=2, max_overflow=1, timeout=0.1)
+
+    # Returned connections are reused instead of reconnecting
+    first = pool.acquire()
+    raw = first._raw
+    first.close()
+    second = pool.acquire()
+    assert second._raw is raw, "Idle connection was not reused"
+
+    # pool_size + max_overflow connections at most, then the pool is exhausted
+    others = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+
+    second.close()
+    for conn in others:
+        conn.close()
+
+    stats = pool.stats()
+    assert stats["connects"] == 3, "Unexpected number of new connections"
+    assert stats["exhausted"] == 1, "Exhaustion event was not counted"
+    assert stats["idle"] == 2, "Overflow connection was kept after checkin"
+    assert stats["checked_out"] == 0, "Connections leaked from the pool"
+
+
+class RecordingConnection:
+    """Raw connection that records the SQL run on it."""
+
+    def __init__(self):
+        self.statements = []
+        self.params = []
+        self.in_transaction = False
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def execute(self, query, params=()):
+        self.statements.append(query)
+        self.params.append(params)
+        self.in_transaction = True
+
+    def fetchall(self):
+        return []
+
+    def commit(self):
+        self.statements.append("COMMIT")
+        self.in_transaction = False
+
+    def rollback(self):
+        self.statements.append("ROLLBACK")
+        self.in_transaction = False
+
+    def close(self):
+        pass
+
+
+def test_request_connection_query_rollback_keeps_earlier_writes():
+    raw = RecordingConnection()
+    connection = RequestConnection(raw)
+
+    # A failing first query may roll back the whole (empty) unit of work
+    connection.begin_query()
+    connection.cursor().execute("INSERT a")
+    connection.rollback()
+    assert raw.statements[-1] == "ROLLBACK"
+
+    connection.begin_query()
+    connection.cursor().execute("INSERT b")
+    connection.commit()
+    connection.after_commit.append(lambda: None)
+
+    # Later failures only undo their own statements
+    connection.begin_query()
+    connection.cursor().execute("INSERT c")
+    connection.after_commit.append(lambda: None)
+    connection.rollback()
+    assert raw.statements[-3:] == [
+        "SAVEPOINT request_query",
+        "INSERT c",
+        "ROLLBACK TO SAVEPOINT request_query",
+    ]
+    assert connection.dirty, "Earlier write was dropped"
+    assert len(connection.after_commit) == 1
+
+    connection.commit_now()
+    assert raw.statements[-1] == "COMMIT"
+    assert raw.statements.count("ROLLBACK") == 1
+
+
+def test_short_search_terms_fall_back_to_like():
+    raw = RecordingConnection()
+    get_connection = bulletin_queries.get_connection
+    bulletin_queries.get_connection = lambda: raw
+    try:
+        # Too short for the full-text index, and a stopword
+        bulletin_queries.search_activities(["5v", "the"], 50)
+        assert "MATCH" not in raw.statements[-1]
+        assert raw.params[-1][:3] == ("%5v%",) * 3
+        assert raw.params[-1][-1] == 50
+
+        # Indexed terms use the index; the short ones are left out
+        bulletin_queries.search_activities(["5v", "football"], 50)
+        assert "MATCH" in raw.statements[-1]
+        assert raw.params[-1] == ("football*", "football*", 50)
+    finally:
+        bulletin_queries.get_connection = get_connection
+
+
+def test_ttl_cache_expiry_and_lru():
+    cache = TTLCache("test", ttl=60, max_entries=2)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return ["featured"]
+
+    # Second lookup is served from the cache
+    assert cache.get_or_load("a", load) == ["featured"]
+    assert cache.get_or_load("a", load) == ["featured"]
+    assert len(loads) == 1, "Cached value was reloaded"
+
+    # Least recently used entry is evicted beyond max_entries
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None, "LRU entry was not evicted"
+    assert cache.get("a") == ["featured"]
+
+    # Invalidated and expired entries are misses
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.ttl = 0
+    cache.set("d", 4)
+    assert cache.get("d") is None, "Expired entry was returned"
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 4
+    assert stats["evictions"] == 1 and stats["expired"] == 1
+
+
+def test_like_buffer_coalesces_toggles():
+    # Post 1 has 10 likes, including one from user 2
+    reads = []
+    batches = []
+
+    def read_states(post_ids, user_id):
+        reads.append((post_ids, user_id))
+        return {1: (10, user_id == 2)} if 1 in post_ids else {}
+
+    def write_batch(changes):
+        batches.append(sorted(changes))
+        return {1: 1}, []
+
+    buffer = LikeBuffer(read_states, write_batch, window=60)
+
+    # Optimistic counts include toggles that are not written yet
+    assert buffer.toggle(1, 3, True) == (True, 11)
+    assert buffer.toggle(1, 3, True) == (False, 11), "Repeated like was counted"
+    assert buffer.toggle(1, 4, True) == (True, 12)
+    assert buffer.toggle(1, 2, False) == (True, 11)
+    assert buffer.toggle(1, 4, False) == (True, 10)
+    assert buffer.toggle(99, 3, True) == (False, None), "Missing post was liked"
+    assert len(reads) == 4, "Persisted state was read more than once per user"
+
+    # Several toggles and reads by one user take a single state read
+    results, states = buffer.toggle_many(5, [(1, True), (99, True)], post_ids=[1, 99])
+    assert results == [(True, 11), (False, None)]
+    assert states == {1: (11, True)}, "Buffered like missing from the state"
+    assert len(reads) == 5
+    buffer.toggle(1, 5, False)
+
+    # Pages rendered for a user show their unwritten toggles
+    assert buffer.pending_toggles(3) == ((1, True),)
+    assert buffer.pending_toggles(4) == (), "Cancelled toggle reported as pending"
+    assert buffer.pending_state(1, 3, 10, False) == (10, True)
+
+    # The like/unlike pairs from users 4 and 5 cancel out and are never written
+    assert buffer.flush() == {1: 1}
+    assert buffer.pending_toggles(3) == ()
+    assert batches == [[(1, 2, False), (1, 3, True)]]
+    assert buffer.flush() == {}, "Flushed toggles were written twice"
+
+    stats = buffer.stats()
+    assert stats["collapsed"] == 2 and stats["rows_written"] == 2
+
+
+def test_like_buffer_reports_lost_toggles():
+    def read_states(post_ids, user_id):
+        return {post_id: (0, False) for post_id in post_ids}
+
+    # The batch fails and so does the retry of the toggle on post 2
+    apply_like_changes = social_feed_management.apply_like_changes
+    social_feed_management.apply_like_changes = lambda changes: (
+        None if len(changes) > 1 or changes[0][0] == 2 else {changes[0][0]: 1}
+    )
+    try:
+        buffer = LikeBuffer(
+            read_states, social_feed_management._write_like_batch, window=60
+        )
+        buffer.toggle(1, 7, True)
+        assert buffer.toggle(2, 7, True) == (True, 1), "Toggle was not acknowledged"
+        assert buffer.flush() == {1: 1}
+    finally:
+        social_feed_management.apply_like_changes = apply_like_changes
+
+    stats = buffer.stats()
+    assert stats["lost_toggles"] == 1, "Lost toggle was not counted"
+    assert stats["rows_written"] == 1
+
+    # A write that raises loses the whole batch
+    def failing_write(changes):
+        raise RuntimeError("database down")
+
+    buffer = LikeBuffer(read_states, failing_write, window=60)
+    buffer.toggle(1, 7, True)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.stats()["lost_toggles"] == 1
+
+
+def test_feed_event_bus_filters_and_drops():
+    bus = feed_events.EventBus()
+    viewer = bus.subscribe(post_ids={1})
+    everyone = bus.subscribe()
+
+    bus.publish({"type": "like", "post_id": 2, "like_count": 3})
+    bus.publish({"type": "post", "post_id": 5})
+    assert viewer.get(timeout=0)["type"] == "post", "Unfollowed like was delivered"
+    assert viewer.get(timeout=0) is None
+    assert everyone.get(timeout=0)["post_id"] == 2
+
+    # A subscriber that stops reading is flagged instead of blocking writers
+    for _ in range(feed_events.SUBSCRIBER_QUEUE_SIZE + 1):
+        bus.publish({"type": "like", "post_id": 1, "like_count": 1})
+    assert viewer.overflowed and everyone.overflowed
+    assert bus.stats()["dropped"] > 0
+
+    viewer.close()
+    everyone.close()
+    assert bus.stats()["subscribers"] == 0
+
+    # Past max_subscribers new streams are turned away until one closes
+    capped = feed_events.EventBus(max_subscribers=1)
+    first = capped.subscribe()
+    assert capped.subscribe() is None, "Subscription past the limit was opened"
+    first.close()
+    assert capped.subscribe() is not None
+    assert capped.stats()["rejected"] == 1
+
+
+def test_post_entity_is_slotted():
+    post = Post(
+        id=1, user="alice", content="hi", image_url="", likes=0, profile_picture="a.png"
+    )
+    assert post.get_profile_picture() == "a.png"
+    assert not hasattr(post, "__dict__")
+    # Every field is declared up front; ad-hoc attributes are rejected
+    with pytest.raises(AttributeError):
+        post.created_at = datetime.now()
+
+
+def _connect_test_db():
+    try:
+        return mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", ""),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", ""),
+            connection_timeout=2,
+        )
+    except mysql.connector.Error:
+        # pytest reports this as a skip; the __main__ runner below catches it
+        raise unittest.SkipTest("MySQL database is not available")
+
+
+def test_concurrent_joins_respect_max_pax():
+    # 300 joins from 200 users race for 5 spots; needs the app's database
+    max_pax, joiners, attempts = 5, 200, 300
+    conn = _connect_test_db()
+    cursor = conn.cursor()
+    tag = uuid.uuid4().hex[:8]
+    user_rows = [
+        (f"join{tag}{i}", "", f"join{tag}{i}@example.com", "user")
+        for i in range(joiners + 1)
+    ]
+    cursor.executemany(
+        "INSERT INTO user (name, password, email, role) VALUES (%s, %s, %s, %s)",
+        user_rows,
+    )
+    cursor.execute("SELECT id FROM user WHERE email LIKE %s", (f"join{tag}%",))
+    host_id, *user_ids = sorted(row[0] for row in cursor.fetchall())
+    cursor.execute(
+        """
+        INSERT INTO sports_activity
+            (user_id, activity_name, activity_type, skills_req, date, location, max_pax)
+        VALUES (%s, 'Join race', 'Sports', 'None', NOW() + INTERVAL 1 DAY, 'Court', %s)
+        """,
+        (host_id, max_pax),
+    )
+    activity_id = cursor.lastrowid
+    conn.commit()
+
+    app = Flask(__name__)
+    init_db_connection(app)
+
+    def join(user_id):
+        with app.app_context():
+            return join_activity_control(activity_id, user_id)[0]
+
+    try:
+        # Some users try twice to exercise the duplicate check as well
+        racers = user_ids + user_ids[: attempts - joiners]
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            results = list(executor.map(join, racers))
+
+        cursor.execute(
+            """
+            SELECT COUNT(*), COUNT(DISTINCT ap.user_id), MAX(sa.participant_count)
+            FROM activity_participant ap
+            JOIN sports_activity sa ON sa.id = ap.activity_id
+            WHERE ap.activity_id = %s
+            """,
+            (activity_id,),
+        )
+        participants, distinct_participants, participant_count = cursor.fetchone()
+        assert results.count(True) == max_pax, "Joins succeeded past max_pax"
+        assert participants == distinct_participants == max_pax
+        assert participant_count == max_pax, "participant_count drifted"
+    finally:
+        # Deleting the users cascades to the activity and its participants
+        cursor.execute("DELETE FROM user WHERE email LIKE %s", (f"join{tag}%",))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
 if __name__ == "__main__":
     test_random_image_filename()
     test_image_size_over_1mb()
     test_image_size_below_1mb()
     test_host_activity_date_in_past()
     test_host_activity_date_in_future()
+    test_connection_pool_reuse_and_exhaustion()
+    test_request_connection_query_rollback_keeps_earlier_writes()
+    test_short_search_terms_fall_back_to_like()
+    test_ttl_cache_expiry_and_lru()
+    test_like_buffer_coalesces_toggles()
+    test_like_buffer_reports_lost_toggles()
+    test_feed_event_bus_filters_and_drops()
+    test_post_entity_is_slotted()
+    try:
+        test_concurrent_joins_respect_max_pax()
+    except unittest.SkipTest as e:
+        print(f"Skipped test_concurrent_joins_respect_max_pax: {e}")
     print("All tests passed!")  # This will only run if the script is executed directly